@@ -0,0 +1,89 @@
+import re
+import sys
+import time
+from utils.prometheus import parse_exposition, iter_raw_samples, metric_key
+
+
+# This function is parse_metrics_to_dict as it was before the streaming parser, kept as the benchmark baseline
+def legacy_parse_metrics_to_dict(response_str):
+    metrics_dict = {}
+    for line in response_str.strip().splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = re.match(r'(\w+)(\{.*?\})?\s+([\d\.\-eE]+)$', line)
+        if match:
+            metric, labels_str, value = match.groups()
+            key = f"{metric}{labels_str or ''}"
+            metrics_dict[key] = value
+    return metrics_dict
+
+
+# This function decodes labels and values with the regexes of format_metrics_as_table as it was before the
+# streaming parser, giving the same {(name, sorted labels): float} mapping as parse_exposition()
+def legacy_parse_decoded(response_str):
+    metrics = {}
+    for line in response_str.strip().splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = re.match(r'(\w+)(\{.*?\})?\s+([\d\.\-eE]+)$', line)
+        if not match:
+            continue
+        metric, labels_str, value = match.groups()
+        labels = tuple(sorted(re.findall(r'(\w+)=["\'](.*?)["\']', labels_str))) if labels_str else ()
+        metrics[(metric, labels)] = float(value)
+    return metrics
+
+
+# This function is parse_metrics_to_dict on the streaming parser
+def parse_metrics_to_dict(response_str):
+    return {metric_key(metric, labels_str): value for metric, labels_str, value in iter_raw_samples(response_str)}
+
+
+# This function builds an ALG like exposition with per rule counters and a latency histogram
+def build_exposition(rules):
+    lines = [
+        "# HELP alg_mml_bytes_transferred Bytes relayed between NE and NEM",
+        "# TYPE alg_mml_bytes_transferred counter",
+        'alg_mml_bytes_transferred{direction="upstream"} 123456',
+        'alg_mml_bytes_transferred{direction="downstream"} 654321',
+        "# HELP alg_filter_rule_hits_total Hits per filter rule",
+        "# TYPE alg_filter_rule_hits_total counter",
+    ]
+    for rule in range(rules):
+        for action in ("accept", "reject", "continue"):
+            lines.append(f'alg_filter_rule_hits_total{{rule_id="rule-{rule}",action="{action}",protocol="mml"}} {rule * 7 + len(action)}')
+    lines.append("# HELP alg_mml_command_latency_seconds MML command latency")
+    lines.append("# TYPE alg_mml_command_latency_seconds histogram")
+    for bound in ("0.005", "0.01", "0.05", "0.1", "0.5", "1", "+Inf"):
+        lines.append(f'alg_mml_command_latency_seconds_bucket{{le="{bound}"}} {int(float(bound) * 1000) if bound != "+Inf" else 2000}')
+    lines.append("alg_mml_command_latency_seconds_sum 12.5")
+    lines.append("alg_mml_command_latency_seconds_count 2000")
+    return "\n".join(lines) + "\n"
+
+
+# This function returns the best time per call in milliseconds, calling the function for about 0.2 s per repeat
+def measure(function, text, repeats=5):
+    start = time.perf_counter()
+    function(text)
+    number = max(1, int(0.2 / max(time.perf_counter() - start, 1e-6)))
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            function(text)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 5000]
+    print(f"{'rules':>8} {'samples':>8} | {'legacy dict':>12} {'dict':>10} | {'legacy decoded':>15} {'exposition':>11}  (ms per scrape)")
+    for rules in sizes:
+        text = build_exposition(rules)
+        assert parse_metrics_to_dict(text) == legacy_parse_metrics_to_dict(text)
+        exposition = parse_exposition(text)
+        assert exposition.values == legacy_parse_decoded(text)
+        print(f"{rules:>8} {len(exposition):>8} | {measure(legacy_parse_metrics_to_dict, text):>12.3f} {measure(parse_metrics_to_dict, text):>10.3f} | "
+              f"{measure(legacy_parse_decoded, text):>15.3f} {measure(parse_exposition, text):>11.3f}")
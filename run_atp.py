@@ -1,25 +1,37 @@
-from ATPSuite import ATPSuite, runner
+from ATPSuite import ATPSuite, runner, config
+from utils import utility
+from utils.scheduler import TestScheduler, NE_HOST, NEM_HOST, ALG_FILTER_RULES, ALG_SERVICE, ALG_LOGS
 
 if __name__ == "__main__":
     suite = ATPSuite()
-    
-    runner.run_test("PreCondition_Config", "Configuring ALG with Golden Config for the Automated Run", suite.PreCondition_Config)
-    runner.run_test("ATP-4_2_1", "To verify the connection between NEM-ALG and ALG-NE over IPv4", lambda: suite.ATP_4_2_1(run_time=10))
-    runner.run_test("ATP-4_2_2", "To verify the connection between NEM-ALG and ALG-NE over IPv6", lambda: suite.ATP_4_2_2(run_time=10))
-    runner.run_test("ATP-4_2_4", "To verify the connection failure between NEM-ALG and ALG-NE due to invalid certificate over IPv4 and IPv6", lambda: suite.ATP_4_2_4(run_time=10))
-    runner.run_test("ATP-4_2_5", "To verify MML filter rule configuration and retrieval via HTTP client", lambda: suite.ATP_4_2_5(run_time=15))
-    runner.run_test("ATP-4_2_6", "To verify Binary encoded MML filter rule configuration and retrieval via HTTP client", lambda: suite.ATP_4_2_6(run_time=10))
-    runner.run_test("ATP-4_2_7", "To verify Mix of MML and Binary encoded MML filter rule configuration and retrieval via HTTP client", lambda: suite.ATP_4_2_7(run_time=10))
-    runner.run_test("ATP-4_2_8", "To verify ALG application rejects Filter rule changes via HTTP client due to different error conditions", suite.ATP_4_2_8)
-    runner.run_test("ATP-4_2_9", "To verify MML Handling of ALG application for Accept Rule", lambda: suite.ATP_4_2_9(run_time=10))
-    runner.run_test("ATP-4_2_10", "To verify MML Handling of ALG application for Reject Rule", lambda: suite.ATP_4_2_10(run_time=10))
-    runner.run_test("ATP-4_2_11", "To verify MML Handling of ALG application for continue Rule", lambda: suite.ATP_4_2_11(run_time=10))
-    runner.run_test("ATP-4_2_12", "To verify MML Handling of ALG application for FTP command in Passive Mode over IPv4", lambda: suite.ATP_4_2_12(run_time=10))
-    runner.run_test("ATP-4_2_13", "To verify MML Handling of ALG application for FTP command in Extended Passive Mode over IPv4", lambda: suite.ATP_4_2_13(run_time=10))
-    runner.run_test("ATP-4_2_14", "To verify MML Handling of ALG application for FTP command in Extended Passive Mode over IPv6", lambda: suite.ATP_4_2_14(run_time=10))
-    runner.run_test("ATP-4_2_15", "To verify MML Handling of ALG application for FTP command in negative conditions", lambda: suite.ATP_4_2_15(run_time=10))
-    runner.run_test("ATP-4_3_1", "To verify ALG service restart with different log levels", suite.ATP_4_3_1)
-    runner.run_test("ATP-4_3_3", "To verify ALG application Metrics for TCP performance and Message Counter", lambda: suite.ATP_4_3_3(run_time=20))
-    runner.run_test("ATP-4_3_4", "To verify ALG application Metrics for filter rules", lambda: suite.ATP_4_3_4(run_time=20))
-    
+    if config.getboolean('AUTOMATION_VARS', 'ALG_JOURNAL_TAIL', fallback=False):
+        utility.start_ALG_journal_tail()
+    scheduler = TestScheduler(runner, max_workers=config.getint('AUTOMATION_VARS', 'MAX_PARALLEL_TESTS', fallback=1))
+
+    # Simulator based test cases hold both simulator hosts and rely on the Golden Config filter rules
+    # Test cases asserting on the ALG logs or metrics hold ALG_LOGS, so no other test adds to them meanwhile
+    simulator = dict(exclusive=[NE_HOST, NEM_HOST, ALG_LOGS], shared=[ALG_FILTER_RULES])
+
+    scheduler.add("PreCondition_Config", "Configuring ALG with Golden Config for the Automated Run", suite.PreCondition_Config, exclusive=[ALG_FILTER_RULES, ALG_LOGS])
+    scheduler.add("ATP-4_2_1", "To verify the connection between NEM-ALG and ALG-NE over IPv4", lambda: suite.ATP_4_2_1(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_2", "To verify the connection between NEM-ALG and ALG-NE over IPv6", lambda: suite.ATP_4_2_2(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_4", "To verify the connection failure between NEM-ALG and ALG-NE due to invalid certificate over IPv4 and IPv6", lambda: suite.ATP_4_2_4(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_5", "To verify MML filter rule configuration and retrieval via HTTP client", lambda: suite.ATP_4_2_5(run_time=15), exclusive=[ALG_FILTER_RULES, ALG_LOGS])
+    scheduler.add("ATP-4_2_6", "To verify Binary encoded MML filter rule configuration and retrieval via HTTP client", lambda: suite.ATP_4_2_6(run_time=10), exclusive=[ALG_FILTER_RULES, ALG_LOGS])
+    scheduler.add("ATP-4_2_7", "To verify Mix of MML and Binary encoded MML filter rule configuration and retrieval via HTTP client", lambda: suite.ATP_4_2_7(run_time=10), exclusive=[ALG_FILTER_RULES, ALG_LOGS])
+    scheduler.add("ATP-4_2_8", "To verify ALG application rejects Filter rule changes via HTTP client due to different error conditions", suite.ATP_4_2_8, shared=[ALG_FILTER_RULES])
+    scheduler.add("ATP-4_2_9", "To verify MML Handling of ALG application for Accept Rule", lambda: suite.ATP_4_2_9(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_10", "To verify MML Handling of ALG application for Reject Rule", lambda: suite.ATP_4_2_10(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_11", "To verify MML Handling of ALG application for continue Rule", lambda: suite.ATP_4_2_11(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_12", "To verify MML Handling of ALG application for FTP command in Passive Mode over IPv4", lambda: suite.ATP_4_2_12(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_13", "To verify MML Handling of ALG application for FTP command in Extended Passive Mode over IPv4", lambda: suite.ATP_4_2_13(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_14", "To verify MML Handling of ALG application for FTP command in Extended Passive Mode over IPv6", lambda: suite.ATP_4_2_14(run_time=10), **simulator)
+    scheduler.add("ATP-4_2_15", "To verify MML Handling of ALG application for FTP command in negative conditions", lambda: suite.ATP_4_2_15(run_time=10), **simulator)
+    scheduler.add("ATP-4_3_1", "To verify ALG service restart with different log levels", suite.ATP_4_3_1, exclusive=[ALG_SERVICE, ALG_LOGS])
+    scheduler.add("ATP-4_3_3", "To verify ALG application Metrics for TCP performance and Message Counter", lambda: suite.ATP_4_3_3(run_time=20), **simulator)
+    scheduler.add("ATP-4_3_4", "To verify ALG application Metrics for filter rules", lambda: suite.ATP_4_3_4(run_time=20), **simulator)
+    scheduler.run()
+    utility.stop_simulator_fixtures()
+    utility.stop_ALG_journal_tail()
+
     runner.generate_summary()
@@ -0,0 +1,48 @@
+import io
+import gzip
+import base64
+import unittest
+from utils.journal_fetch import write_journal, decode_journal
+
+JOURNAL = b"line1\nline2\n\nline3\nline4\n-- cursor: s=abc;i=42\n"
+EXPECTED = b"line1\nline2\n\nline3\nline4\n"
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class WriteJournalTest(unittest.TestCase):
+    def test_single_block(self):
+        destination = io.BytesIO()
+        cursor, written, _ = write_journal([gzip.compress(JOURNAL)], destination)
+        self.assertEqual(destination.getvalue(), EXPECTED)
+        self.assertEqual(cursor, "s=abc;i=42")
+        self.assertEqual(written, len(EXPECTED))
+
+    def test_chunked_stream(self):
+        compressed = gzip.compress(JOURNAL)
+        for size in (1, 2, 7, 16):
+            destination = io.BytesIO()
+            cursor, written, transferred = write_journal(_chunks(compressed, size), destination)
+            self.assertEqual(destination.getvalue(), EXPECTED, f"chunk size {size}")
+            self.assertEqual(cursor, "s=abc;i=42")
+            self.assertEqual(written, len(EXPECTED))
+            self.assertEqual(transferred, len(compressed))
+
+    def test_without_cursor_or_final_newline(self):
+        destination = io.BytesIO()
+        cursor, _, _ = write_journal(_chunks(gzip.compress(b"line1\nline2"), 3), destination)
+        self.assertEqual(destination.getvalue(), b"line1\nline2")
+        self.assertIsNone(cursor)
+
+    def test_decode_journal(self):
+        destination = io.BytesIO()
+        cursor, _, _ = decode_journal(base64.b64encode(gzip.compress(JOURNAL)).decode() + "\n", destination)
+        self.assertEqual(destination.getvalue(), EXPECTED)
+        self.assertEqual(cursor, "s=abc;i=42")
+        self.assertEqual(decode_journal("", io.BytesIO()), (None, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,27 @@
-import paramiko
+import io
+import os
+import re
+import zlib
+import codecs
+import select
+import shlex
 import threading
 import time
+from collections import deque
 from . import utility
+from .wait_engine import OutputWatcher
+from .html_report_generator import get_current_testcase, set_current_testcase
+
+# Capture loop settings: receive size, log file write buffer, flush interval and select timeout (which also
+# bounds how long a stop request waits to be noticed)
+RECV_SIZE = 65536
+WRITE_BUFFER = 1024 * 1024
+FLUSH_INTERVAL = 0.5
+SELECT_TIMEOUT = 0.2
+
+# A row of the simulator stats table with a count, e.g. "| Total connections | 2 |"
+_STATS_ROW_RE = re.compile(rb"\|[ \t]*([^|\r\n]*?[^|\s])[ \t]*\|[ \t]*(\d+)[ \t]*\|")
+
 
 # This class represents a server that can be started, stopped, and configured via SSH
 class Server:
@@ -18,65 +38,426 @@ class Server:
         self.client = None
         self.thread = None
         self.stop_flag = threading.Event()
+        self.testcase_id = None
+        self.run_command = command
+        self.start_latency = None
 
-    # Apply configuration to the server by uploading a config file via SFTP
+        # Fixture mode: stop_server() keeps the simulator running so a later test with the same config reuses it
+        self.keep_alive = False
+        self.config_hash = None
+        self.idle_log_file = None
+        # Latest value of every stats table row, and the values when the current test case attached
+        # (the stats of a simulator are cumulative, see wait_engine.stats_pattern)
+        self.stats = {}
+        self.stats_offset = {}
+        self._stats_partial = b""
+
+        # Output watchers are fed under this condition, together with the log file writes
+        self._output_cond = threading.Condition()
+        self._watchers = []
+        self._exited = False
+        self._log = None
+        self._last_flush = 0.0
+        self.captured_bytes = 0
+        self.stop_grace = 1.0
+        self.stop_join_margin = 5
+
+    # Apply configuration to the server, uploading the config file via SFTP only if its content is not staged yet
     def apply_config(self, local_config_path, remote_config_path):
         if not local_config_path:
             self.logger.info(f"[{self.name}] No config file provided to apply")
             return
         try:
             self.logger.info(f"Updating {self.name} simulator config file")
-            transport = paramiko.Transport((self.ip, 22))
-            transport.connect(username=self.username, password=self.password)
-            sftp = paramiko.SFTPClient.from_transport(transport)
-            sftp.put(local_config_path, remote_config_path)
-            sftp.close()
-            transport.close()
-            self.logger.info(f"{self.name} simulator config file updated successful")
+            # Configs are staged by content hash; an identical remote config is not touched
+            if utility._config_stager.select(self.ip, self.username, self.password, self.path, local_config_path, remote_config_path):
+                self.logger.info(f"{self.name} simulator config file updated successful")
+            else:
+                self.logger.info(f"{self.name} simulator config file already up to date")
         except Exception as e:
             self.logger.error(f"Failed to update {self.name} simulator config file: {e}", exc_info=True)
 
     # Start the server and run the command in a separate thread
-    def start_server(self):
+    # run_command is the command resolved beforehand with utility.resolve_simulator_command(), if any
+    def start_server(self, run_command=None):
         self.client = utility.ssh_connect(self.ip, self.username, self.password)
         if self.client is None:
             self.logger.error(f"[{self.name}] Failed to establish SSH connection")
             return
         self.stop_flag.clear()
+        self._exited = False
+        # Logs from the output thread belong to the test case that started the server
+        self.testcase_id = get_current_testcase()
+        if run_command is None:
+            run_command = utility.resolve_simulator_command(self.name, self.ip, self.username, self.password, self.path, self.command)
+        self.run_command = run_command
+        self._start_time = time.monotonic()
+        self.start_latency = None
         self.thread = threading.Thread(target=self._run, daemon=True)
         self.thread.start()
 
+    # Check if the simulator process is still running
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive() and not self._exited
+
+    # Send the simulator output to another log file from now on
+    # Output written before the switch stays in the previous file, so waits only see the new output
+    def _switch_log(self, log_file):
+        with self._output_cond:
+            if self._log is not None:
+                self._log.close()
+            self.log_file = log_file
+            self._log = open(log_file, "wb", buffering=WRITE_BUFFER)
+
+    # Reuse the running simulator for another test case: its output goes to the test case log file
+    # The stats reached so far are kept as offset, so stats conditions of the test case count from now on
+    def attach(self, testcase_id, log_file):
+        self.testcase_id = testcase_id
+        with self._output_cond:
+            self.stats_offset = dict(self.stats)
+        self._switch_log(log_file)
+        self.logger.info(f"[{self.name}] Reusing running simulator, output now logged to {log_file} (stats offset {self.stats_offset})")
+
+    # Keep the latest value of the stats table rows in complete lines of output
+    def _track_stats(self, data):
+        lines = (self._stats_partial + data).split(b"\n")
+        self._stats_partial = lines.pop()[-4096:]
+        for line in lines:
+            if b"|" in line:
+                for field, value in _STATS_ROW_RE.findall(line):
+                    self.stats[field.decode('utf-8', errors='replace')] = int(value)
+
+    # Write raw simulator output to the buffered log file and feed the decoded text to the active watchers
+    # The log file is flushed every FLUSH_INTERVAL seconds, and before a wait replays it
+    def _publish(self, data, text):
+        with self._output_cond:
+            self._log.write(data)
+            if self.keep_alive:
+                self._track_stats(data)
+            now = time.monotonic()
+            if now - self._last_flush >= FLUSH_INTERVAL:
+                self._log.flush()
+                self._last_flush = now
+            for watcher in self._watchers:
+                watcher.feed(text)
+            self._output_cond.notify_all()
+
+    # Record the time from start_server() to the first simulator output in Timings.csv
+    def _record_start_latency(self):
+        self.start_latency = time.monotonic() - self._start_time
+        self.logger.info(f"[{self.name}] Simulator produced first output {self.start_latency:.2f} seconds after start")
+        utility.record_timing(self.testcase_id, f"{self.name}_start_latency", self.start_latency)
+
+    # Receive the available output of the channel and publish it; returns False once the channel is at EOF
+    def _capture(self, channel, decoder):
+        data = channel.recv(RECV_SIZE)
+        if not data:
+            return False
+        if self.start_latency is None:
+            self._record_start_latency()
+        self.captured_bytes += len(data)
+        self._publish(data, decoder.decode(data))
+        return True
+
     # Internal method to run the server command in a separate thread
+    # Output is awaited with select() on the channel instead of polling, and read in large blocks
     def _run(self):
+        set_current_testcase(self.testcase_id)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        capture_start = time.monotonic()
+        self.captured_bytes = 0
         try:
             transport = self.client.get_transport()
             channel = transport.open_session()
             channel.get_pty()
-            channel.exec_command(f"cd {self.path} && {self.command}")
+            channel.exec_command(f"cd {self.path} && {self.run_command}")
 
-            with open(self.log_file, "w") as f:
+            self._switch_log(self.log_file)
+            try:
                 while not self.stop_flag.is_set():
-                    if channel.recv_ready():
-                        output = channel.recv(1024).decode('utf-8', errors='replace')
-                        f.write(output)
-                        f.flush()
-                    time.sleep(0.2)
+                    if get_current_testcase() != self.testcase_id:
+                        set_current_testcase(self.testcase_id)
+                    readable, _, _ = select.select([channel], [], [], SELECT_TIMEOUT)
+                    if readable or channel.recv_ready():
+                        if self._capture(channel, decoder):
+                            continue
+                        # End of output: the simulator process has exited
+                        self.logger.info(f"[{self.name}] Simulator process exited with status {channel.recv_exit_status()}")
+                        break
+                    with self._output_cond:
+                        self._log.flush()
+
+                if self.stop_flag.is_set() and not channel.exit_status_ready():
+                    # Interrupt the simulator and keep its last output until it exits or the grace period ends
+                    channel.send("\x03")
+                    deadline = time.monotonic() + self.stop_grace
+                    while time.monotonic() < deadline:
+                        readable, _, _ = select.select([channel], [], [], max(0.0, min(SELECT_TIMEOUT, deadline - time.monotonic())))
+                        if (readable or channel.recv_ready()) and self._capture(channel, decoder):
+                            continue
+                        if channel.exit_status_ready():
+                            break
+            finally:
+                with self._output_cond:
+                    tail = decoder.decode(b"", final=True)
+                    for watcher in self._watchers:
+                        watcher.feed(tail)
+                    self._log.close()
 
             channel.close()
         except Exception as e:
             self.logger.error(f"[{self.name}] Error in remote logging: {e}", exc_info=True)
         finally:
+            with self._output_cond:
+                self._exited = True
+                for watcher in self._watchers:
+                    watcher.flush()
+                self._output_cond.notify_all()
+            elapsed = time.monotonic() - capture_start
+            rate = self.captured_bytes / elapsed if elapsed > 0 else 0.0
+            self.logger.info(f"[{self.name}] Captured {self.captured_bytes} bytes of output in {elapsed:.2f} seconds ({rate / 1024:.1f} KiB/s)")
             self.logger.info(f"{self.name} simulator stopped successfully")
 
+    # Output captured so far, replayed to a new wait; called with _output_cond held
+    def _replay(self):
+        if self._log is not None and not self._log.closed:
+            self._log.flush()
+        if not os.path.exists(self.log_file):
+            return ""
+        with open(self.log_file, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+    # Wait until the simulator output meets all conditions, the simulator exits or the timeout expires
+    # Output captured before the call is taken into account. Returns True if all conditions were met
+    def wait_until(self, conditions, timeout):
+        watcher = OutputWatcher(conditions)
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._output_cond:
+            watcher.feed(self._replay())
+            if self._exited:
+                watcher.flush()
+            self._watchers.append(watcher)
+            try:
+                while not watcher.satisfied and not self._exited:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._output_cond.wait(remaining)
+            finally:
+                self._watchers.remove(watcher)
+
+        elapsed = time.monotonic() - start
+        if watcher.satisfied:
+            self.logger.info(f"[{self.name}] Completion conditions met after {elapsed:.2f} seconds")
+        else:
+            pending = ", ".join(str(c) for c in watcher.conditions if not c.met)
+            reason = "simulator exited" if self._exited else f"timeout of {timeout:.1f} seconds expired"
+            self.logger.warning(f"[{self.name}] Completion conditions not met ({reason}): {pending}")
+        return watcher.satisfied
+
     # Stop the server and clean up resources
-    def stop_server(self):
+    # The simulator is interrupted and given up to stop_grace seconds to exit and flush its output
+    # In fixture mode the simulator is kept running (its output goes to idle_log_file) unless force is set
+    def stop_server(self, stop_grace=1.0, force=False):
+        if self.keep_alive and not force and self.is_running():
+            self.logger.info(f"Keeping {self.name} simulator running for reuse")
+            if self.idle_log_file:
+                self._switch_log(self.idle_log_file)
+            return
         self.logger.info(f"Stopping {self.name} simulator")
+        self.stop_grace = stop_grace
         self.stop_flag.set()
 
+        # The capture loop notices the stop within SELECT_TIMEOUT and then drains for at most stop_grace seconds
         if self.thread and self.thread.is_alive():
-            self.thread.join()
+            stop_requested = time.monotonic()
+            self.thread.join(timeout=SELECT_TIMEOUT + stop_grace + self.stop_join_margin)
+            if self.thread.is_alive():
+                self.logger.warning(f"[{self.name}] Capture thread did not stop in time")
+            else:
+                self.logger.debug(f"[{self.name}] Log file closed {time.monotonic() - stop_requested:.2f} seconds after stop")
             self.thread = None
 
         if self.client:
-            self.client.close()
-            self.client = None
\ No newline at end of file
+            utility.ssh_release(self.client)
+            self.client = None
+
+
+# Remote-file logging settings: live tail poll interval, largest block fetched per poll, size of the live
+# tail kept for waits, and attempts of the final fetch
+TAIL_POLL_INTERVAL = 0.5
+TAIL_MAX_FETCH = 4 * 1024 * 1024
+LIVE_TAIL_SIZE = 1024 * 1024
+FETCH_ATTEMPTS = 3
+
+
+# This function runs a command on an SSH client and streams its gzip output, decompressed, to a binary file
+# Returns (exit status, uncompressed bytes written)
+def _fetch_gzip(client, command, destination):
+    channel = client.get_transport().open_session()
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    written = 0
+    try:
+        channel.exec_command(command)
+        while True:
+            data = channel.recv(RECV_SIZE)
+            if not data:
+                break
+            block = decompressor.decompress(data)
+            destination.write(block)
+            written += len(block)
+        block = decompressor.flush()
+        destination.write(block)
+        written += len(block)
+        return channel.recv_exit_status(), written
+    finally:
+        channel.close()
+
+
+# This class runs a simulator that writes its output to a file on its own host instead of a PTY stream
+# While a wait is active the new part of the remote file is polled (gzip compressed) and fed to the watchers;
+# only the last LIVE_TAIL_SIZE bytes are kept for later waits. At stop the simulator is interrupted and the
+# whole file is fetched once, compressed, resuming from the bytes already received if the transfer fails.
+class RemoteFileServer(Server):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.remote_log_file = None
+        self.pid = None
+        self.stop_join_margin = 120
+        self._tail_offset = 0
+        self._live_tail = deque()
+        self._live_tail_size = 0
+        self._decoder = None
+
+    # Run a short command on the simulator host and return (exit status, output)
+    def _exec(self, command):
+        with utility._ssh_pool.connection(self.ip, self.username, self.password) as client:
+            channel = client.get_transport().open_session()
+            try:
+                channel.exec_command(command)
+                output = channel.makefile('r').read().decode('utf-8', errors='replace')
+                return channel.recv_exit_status(), output
+            finally:
+                channel.close()
+
+    # Start the simulator in the background on its host, writing to a remote log file
+    def start_server(self, run_command=None):
+        if run_command is None:
+            run_command = utility.resolve_simulator_command(self.name, self.ip, self.username, self.password, self.path, self.command)
+        self.run_command = run_command
+        self.stop_flag.clear()
+        self._exited = False
+        self.testcase_id = get_current_testcase()
+        self._start_time = time.monotonic()
+        self.remote_log_file = f"{self.path}/.alg-sim-logs/{self.name}-{int(time.time() * 1000)}.log"
+        log_dir = shlex.quote(os.path.dirname(self.remote_log_file))
+        try:
+            # 'setsid -f' instead of '&': a background job of a non-interactive shell ignores SIGINT,
+            # which would prevent the simulator from handling the interrupt at stop
+            pid_file = shlex.quote(f"{self.remote_log_file}.pid")
+            launch = shlex.quote(f"echo $$ > {pid_file}; exec {run_command}")
+            status, output = self._exec(
+                f"mkdir -p {log_dir} && cd {shlex.quote(self.path)} && "
+                f"setsid -f sh -c {launch} > {shlex.quote(self.remote_log_file)} 2>&1 < /dev/null && "
+                f"for i in $(seq 50); do [ -s {pid_file} ] && break; sleep 0.1; done; cat {pid_file} && rm -f {pid_file}"
+            )
+            self.pid = int(output.strip().splitlines()[-1])
+        except Exception as e:
+            self.logger.error(f"[{self.name}] Failed to start simulator: {e}", exc_info=True)
+            return
+        self.start_latency = time.monotonic() - self._start_time
+        self.logger.info(f"[{self.name}] Simulator started with pid {self.pid}, logging to {self.ip}:{self.remote_log_file}")
+        utility.record_timing(self.testcase_id, f"{self.name}_start_latency", self.start_latency)
+        self._tail_offset = 0
+        self._live_tail.clear()
+        self._live_tail_size = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # Fetch the part of the remote file written since the last poll and feed it to the watchers
+    # Returns False once the simulator process has exited
+    def _poll_tail(self):
+        remote_file = shlex.quote(self.remote_log_file)
+        command = f"tail -c +{self._tail_offset + 1} {remote_file} | head -c {TAIL_MAX_FETCH} | gzip -c; kill -0 {self.pid} 2>/dev/null"
+        buffer = io.BytesIO()
+        with utility._ssh_pool.connection(self.ip, self.username, self.password) as client:
+            status, written = _fetch_gzip(client, command, buffer)
+        if written:
+            self._tail_offset += written
+            self.captured_bytes += written
+            text = self._decoder.decode(buffer.getvalue())
+            with self._output_cond:
+                self._live_tail.append(text)
+                self._live_tail_size += len(text)
+                while self._live_tail_size > LIVE_TAIL_SIZE and len(self._live_tail) > 1:
+                    self._live_tail_size -= len(self._live_tail.popleft())
+                for watcher in self._watchers:
+                    watcher.feed(text)
+                self._output_cond.notify_all()
+        return status == 0
+
+    # Fetch the whole remote log file to the local log file, resuming after a failed transfer
+    def _fetch_log(self):
+        remote_file = shlex.quote(self.remote_log_file)
+        received = 0
+        start = time.monotonic()
+        with open(self.log_file, "wb") as f:
+            for attempt in range(1, FETCH_ATTEMPTS + 1):
+                try:
+                    with utility._ssh_pool.connection(self.ip, self.username, self.password) as client:
+                        status, written = _fetch_gzip(client, f"tail -c +{received + 1} {remote_file} | gzip -c", f)
+                    received += written
+                    break
+                except Exception as e:
+                    # Keep what was written and continue after the last complete byte
+                    f.flush()
+                    received = f.tell()
+                    self.logger.warning(f"[{self.name}] Log fetch attempt {attempt} failed after {received} bytes: {e}")
+            else:
+                self.logger.error(f"[{self.name}] Failed to fetch simulator log {self.remote_log_file}")
+                return
+        self.captured_bytes = received
+        self.logger.info(f"[{self.name}] Fetched {received} bytes of simulator log in {time.monotonic() - start:.2f} seconds")
+        self._exec(f"rm -f {remote_file}")
+
+    # Poll the live tail while a wait is active; at stop interrupt the simulator and fetch its log
+    def _run(self):
+        set_current_testcase(self.testcase_id)
+        try:
+            alive = True
+            while alive and not self.stop_flag.is_set():
+                if get_current_testcase() != self.testcase_id:
+                    set_current_testcase(self.testcase_id)
+                with self._output_cond:
+                    waiting = bool(self._watchers)
+                if waiting:
+                    alive = self._poll_tail()
+                self.stop_flag.wait(TAIL_POLL_INTERVAL)
+
+            if self.stop_flag.is_set():
+                # Interrupt the simulator like Ctrl-C and give it stop_grace seconds to write its last output
+                tries = max(1, int(self.stop_grace / 0.1))
+                # The simulator runs in its own session, so the whole process group is signalled
+                self._exec(f"kill -INT -{self.pid} 2>/dev/null; for i in $(seq {tries}); do kill -0 {self.pid} 2>/dev/null || break; sleep 0.1; done; kill -KILL -{self.pid} 2>/dev/null; true")
+            else:
+                self.logger.info(f"[{self.name}] Simulator process exited")
+            self._fetch_log()
+        except Exception as e:
+            self.logger.error(f"[{self.name}] Error in remote logging: {e}", exc_info=True)
+        finally:
+            with self._output_cond:
+                self._exited = True
+                for watcher in self._watchers:
+                    watcher.flush()
+                self._output_cond.notify_all()
+            self.logger.info(f"{self.name} simulator stopped successfully")
+
+    # Only the live tail is replayed to a new wait
+    def _replay(self):
+        return "".join(self._live_tail)
+
+    # The remote log file is fetched in full at stop, so only the local destination changes
+    def _switch_log(self, log_file):
+        self.log_file = log_file
@@ -0,0 +1,138 @@
+import json
+import logging
+from collections import namedtuple
+from .log_verifier import LogReport
+
+logger = logging.getLogger("AutomationLogger")
+
+# Keys the ALG uses in its JSON log payload, in order of preference
+_MESSAGE_KEYS = ("msg", "message")
+_CONNECTION_KEYS = ("connection-id", "connection_id", "conn-id", "conn_id", "connId", "connectionId")
+
+# The fields records are indexed by
+INDEXED_FIELDS = ("level", "message", "operation", "operation_object", "connection_id")
+
+# One ALG log line: its line number, the journal prefix (time, host, process), the indexed fields as strings
+# (None when absent) and the whole JSON payload ({} for lines that are not JSON, whose text is the message)
+ALGLogRecord = namedtuple("ALGLogRecord", ["line_number", "prefix", "level", "message", "operation",
+                                           "operation_object", "connection_id", "fields"])
+
+_decoder = json.JSONDecoder()
+
+
+def _first(fields, keys):
+    for key in keys:
+        if key in fields:
+            return str(fields[key])
+    return None
+
+
+# This function parses one journal line into an ALGLogRecord
+# The JSON payload starts at the first '{' after the journal prefix; anything after it is ignored
+def parse_record(line_number, line):
+    line = line.rstrip("\n")
+    separator = line.find(": ")
+    prefix, payload = (line[:separator], line[separator + 2:]) if separator >= 0 else ("", line)
+    start = payload.find("{")
+    if start >= 0:
+        try:
+            fields, _ = _decoder.raw_decode(payload, start)
+        except ValueError:
+            fields = None
+        if isinstance(fields, dict):
+            level = fields.get("level")
+            return ALGLogRecord(line_number, prefix, str(level).lower() if level is not None else None,
+                                _first(fields, _MESSAGE_KEYS), _first(fields, ("operation",)),
+                                _first(fields, ("operation-object", "operation_object")),
+                                _first(fields, _CONNECTION_KEYS), fields)
+    return ALGLogRecord(line_number, prefix, None, payload.strip(), None, None, None, {})
+
+
+# This class describes one expectation on the ALG log as a query on the indexed fields
+# message matches records whose message contains the text; the other fields must be equal.
+# expected_count None means "at least once", an integer means exactly that many records (0 = must not appear)
+class ALGLogQuery:
+    def __init__(self, expected_count=None, level=None, message=None, operation=None, operation_object=None, connection_id=None):
+        self.expected_count = expected_count
+        self.criteria = {name: value for name, value in (("level", level), ("message", message), ("operation", operation),
+                                                         ("operation_object", operation_object), ("connection_id", connection_id))
+                         if value is not None}
+
+    def check(self, count):
+        if self.expected_count is None:
+            return count > 0
+        return count == self.expected_count
+
+    def __str__(self):
+        expected = "at least 1" if self.expected_count is None else self.expected_count
+        criteria = ", ".join(f"{name}={value!r}" for name, value in self.criteria.items())
+        return f"[{criteria}] expected {expected}"
+
+
+# This class holds the records of an ALG log with an index per field: {field: {value: [record positions]}}
+# A query intersects the position lists of its criteria, starting from the shortest, so it costs about the
+# number of matching records instead of a scan of the file. Message queries look up the distinct messages
+# containing the text, of which there are few compared to the records.
+class ALGLog:
+    def __init__(self, records, path=None):
+        self.path = path
+        self.records = records
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        for position, record in enumerate(records):
+            for field in INDEXED_FIELDS:
+                value = getattr(record, field)
+                if value is not None:
+                    self.indexes[field].setdefault(value, []).append(position)
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            records = [parse_record(line_number, line) for line_number, line in enumerate(f, 1) if line.strip()]
+        logger.debug(f"Indexed {len(records)} ALG log records of {path}")
+        return cls(records, path)
+
+    # Positions of the records matching one criterion
+    def _positions(self, field, value):
+        index = self.indexes[field]
+        if field != "message":
+            return index.get(str(value).lower() if field == "level" else str(value), [])
+        return sorted(p for message, positions in index.items() if value in message for p in positions)
+
+    # Records matching every given criterion (level, message, operation, operation_object, connection_id)
+    def query(self, **criteria):
+        if not criteria:
+            return list(self.records)
+        lists = sorted((self._positions(field, value) for field, value in criteria.items()), key=len)
+        matches = lists[0]
+        for positions in lists[1:]:
+            if not matches:
+                break
+            wanted = set(positions)
+            matches = [p for p in matches if p in wanted]
+        return [self.records[p] for p in matches]
+
+    def count(self, **criteria):
+        if len(criteria) == 1:
+            (field, value), = criteria.items()
+            return len(self._positions(field, value))
+        return len(self.query(**criteria))
+
+    # Distinct values of a field with their number of records, e.g. counts("operation")
+    def counts(self, field):
+        return {value: len(positions) for value, positions in self.indexes[field].items()}
+
+    # Evaluate a list of ALGLogQuery; the result is a LogReport like verify_log()
+    def verify(self, queries):
+        results = []
+        for query in queries:
+            count = self.count(**query.criteria)
+            passed = query.check(count)
+            results.append((query, count, passed))
+            if passed:
+                logger.info(f"Success - {query} - found {count} times in {self.path}")
+            else:
+                logger.warning(f"Failed - {query} - found {count} times in {self.path}")
+        return LogReport(self.path, results)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from .remote_batch import RemoteResult, sudo_command
+
+logger = logging.getLogger("AutomationLogger")
+
+# Size of the reads from a channel
+_RECV_SIZE = 65536
+
+
+# This class follows one exec channel from the event loop
+# paramiko signals new data, stderr data and the closing of a channel on the pipe behind channel.fileno(),
+# so the channel is read from a loop reader callback instead of a blocked thread.
+class _ChannelReader:
+    def __init__(self, loop, channel, on_stdout, on_stderr):
+        self.loop = loop
+        self.channel = channel
+        self.on_stdout = on_stdout
+        self.on_stderr = on_stderr
+        self.done = loop.create_future()
+        self.fd = channel.fileno()
+        channel.setblocking(0)
+        loop.add_reader(self.fd, self._ready)
+
+    # Drain both streams; the pipe is shared, so a read of one stream may clear the event of the other
+    def _ready(self):
+        channel = self.channel
+        try:
+            while True:
+                if channel.recv_ready():
+                    self.on_stdout(channel.recv(_RECV_SIZE))
+                elif channel.recv_stderr_ready():
+                    self.on_stderr(channel.recv_stderr(_RECV_SIZE))
+                else:
+                    break
+        except Exception as e:
+            self.close()
+            if not self.done.done():
+                self.done.set_exception(e)
+            return
+        if channel.closed or (channel.eof_received and channel.exit_status_ready()):
+            self.close()
+            if not self.done.done():
+                self.done.set_result(channel.recv_exit_status())
+
+    def close(self):
+        if self.fd is not None:
+            self.loop.remove_reader(self.fd)
+            self.fd = None
+
+
+# This class drives remote hosts from asyncio on top of the shared SSH connection pool
+# run, stream, put and get are awaitable, so one test can work on the NE, NEM and ALG hosts at the same
+# time from a single thread. Command output is read from the event loop; only the calls paramiko has
+# no non-blocking form of (connecting, opening channels, SFTP) go to one small shared executor.
+class AsyncRemote:
+    def __init__(self, ssh_pool, max_workers=8):
+        self.ssh_pool = ssh_pool
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-remote")
+
+    # Run a blocking function (pooled SSH, SFTP, config upload) on the shared executor and await its result
+    async def call(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    # Pooled client for the host, handed back to the pool on exit
+    @asynccontextmanager
+    async def connection(self, ip_address, username, password, port=22):
+        client = await self.call(self.ssh_pool.acquire, ip_address, username, password, port)
+        try:
+            yield client
+        finally:
+            self.ssh_pool.release(client)
+
+    # Open a channel and start the command on it
+    def _exec(self, client, command):
+        channel = client.get_transport().open_session()
+        try:
+            channel.exec_command(command)
+        except Exception:
+            channel.close()
+            raise
+        return channel
+
+    # Run a command and return its RemoteResult; the channel is closed if the timeout expires
+    async def run(self, ip_address, username, password, command, timeout=None, port=22):
+        stdout, stderr = [], []
+        async with self.connection(ip_address, username, password, port) as client:
+            channel = await self.call(self._exec, client, sudo_command(command, password))
+            reader = _ChannelReader(asyncio.get_running_loop(), channel, stdout.append, stderr.append)
+            try:
+                status = await asyncio.wait_for(reader.done, timeout)
+            finally:
+                reader.close()
+                channel.close()
+        return RemoteResult(b"".join(stdout).decode('utf-8', errors='replace'),
+                            b"".join(stderr).decode('utf-8', errors='replace'), status)
+
+    # Run a command and yield its stdout as it arrives (bytes); stderr is logged
+    # Leaving the iteration early closes the channel, which stops the remote command
+    async def stream(self, ip_address, username, password, command, port=22):
+        queue = asyncio.Queue()
+
+        def on_stderr(data):
+            logger.debug(f"Remote stream error ({command}): {data.decode('utf-8', errors='replace').strip()}")
+
+        async with self.connection(ip_address, username, password, port) as client:
+            channel = await self.call(self._exec, client, sudo_command(command, password))
+            reader = _ChannelReader(asyncio.get_running_loop(), channel, queue.put_nowait, on_stderr)
+            reader.done.add_done_callback(lambda _: queue.put_nowait(None))
+            try:
+                while True:
+                    data = await queue.get()
+                    if data is None:
+                        break
+                    yield data
+                if reader.done.exception() is not None:
+                    raise reader.done.exception()
+            finally:
+                reader.close()
+                channel.close()
+
+    # SFTP transfer on a pooled client
+    def _transfer(self, client, upload, local_path, remote_path):
+        sftp = client.open_sftp()
+        try:
+            if upload:
+                sftp.put(local_path, remote_path)
+            else:
+                sftp.get(remote_path, local_path)
+        finally:
+            sftp.close()
+
+    # Upload a local file to the host
+    async def put(self, ip_address, username, password, local_path, remote_path, port=22):
+        async with self.connection(ip_address, username, password, port) as client:
+            await self.call(self._transfer, client, True, local_path, remote_path)
+
+    # Download a file from the host
+    async def get(self, ip_address, username, password, remote_path, local_path, port=22):
+        async with self.connection(ip_address, username, password, port) as client:
+            await self.call(self._transfer, client, False, local_path, remote_path)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,67 @@
+import os
+import json
+import threading
+from collections import namedtuple
+
+# A request from the API catalog, with the body already serialized and encoded (None when there is no body)
+ApiRequest = namedtuple("ApiRequest", ["method", "api_path", "headers", "body"])
+
+
+# This class loads a JSON file once and reloads it only when the file changes on disk (mtime or size)
+# An optional build function turns the parsed JSON into the object handed out to callers
+class JSONFileCache:
+    def __init__(self, path, build=None):
+        self.path = path
+        self.build = build
+        self._signature = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._signature:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._value = self.build(data) if self.build else data
+                self._signature = signature
+            return self._value
+
+
+# This function precompiles an API catalog (e.g. api_atp.json) into ApiRequest entries
+def build_api_catalog(api_config):
+    catalog = {}
+    for api_key, api_details in api_config.items():
+        data = api_details.get("data", None)
+        catalog[api_key] = ApiRequest(
+            method=api_details.get("method", "POST").upper(),
+            api_path=api_details.get("api_path", ""),
+            headers=api_details.get("headers", {"Content-Type": "application/json"}),
+            body=json.dumps(data).encode("utf-8") if data else None
+        )
+    return catalog
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+# This function returns the cache for a JSON file, creating it on first use
+def _get_cache(path, build=None):
+    path = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = JSONFileCache(path, build)
+    return cache
+
+
+# This function returns the precompiled API catalog of a JSON file as {api_key: ApiRequest}
+def get_api_catalog(path):
+    return _get_cache(path, build_api_catalog).get()
+
+
+# This function returns the parsed expected values of a JSON file
+def get_expected_values(path):
+    return _get_cache(path).get()
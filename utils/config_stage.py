@@ -0,0 +1,115 @@
+import shlex
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger("AutomationLogger")
+
+# Directory under the simulator START_PATH holding the staged configs, named <sha256>.yaml
+STAGE_DIR = ".alg-configs"
+
+
+# This function returns the sha256 of a local file
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# This class stages simulator configs on the simulator hosts by content hash
+# Every config is uploaded once to <START_PATH>/.alg-configs/<sha256>.yaml; a manifest of the staged hashes
+# and of the hash currently selected as config.yaml is kept per host, so an unchanged config costs no round
+# trip at all and a changed staged one only a remote copy. The manifest is seeded from the host on first use.
+class ConfigStager:
+    def __init__(self, ssh_pool):
+        self.ssh_pool = ssh_pool
+        self._staged = {}  # (ip, path) -> set of staged hashes
+        self._selected = {}  # (ip, remote config path) -> selected hash
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _host_lock(self, ip_address, path):
+        with self._lock:
+            return self._locks.setdefault((ip_address, path), threading.Lock())
+
+    # Run a command on an open client and return its output
+    def _exec(self, client, command):
+        channel = client.get_transport().open_session()
+        try:
+            channel.exec_command(command)
+            output = channel.makefile('r').read().decode('utf-8', errors='replace')
+            status = channel.recv_exit_status()
+        finally:
+            channel.close()
+        if status != 0:
+            raise RuntimeError(f"Remote command failed with status {status}: {command}")
+        return output
+
+    # Read the staged configs (verified by their remote sha256) and the hash of the current config files
+    def _load_manifest(self, client, ip_address, path, remote_config_paths=()):
+        stage_dir = shlex.quote(f"{path}/{STAGE_DIR}")
+        targets = " ".join(shlex.quote(p) for p in remote_config_paths)
+        output = self._exec(client, f"mkdir -p {stage_dir} && cd {stage_dir} && "
+                                    f"{{ sha256sum -- *.yaml 2>/dev/null; echo '--'; sha256sum -- {targets} 2>/dev/null; }}; true")
+        staged, _, current = output.partition("--\n")
+        hashes = set()
+        for line in staged.splitlines():
+            digest, _, name = line.strip().partition("  ")
+            # A file only counts as staged if its content still matches its name
+            if name == f"{digest}.yaml":
+                hashes.add(digest)
+        self._staged[(ip_address, path)] = hashes
+        for line in current.splitlines():
+            digest, _, name = line.strip().partition("  ")
+            if name:
+                self._selected[(ip_address, name)] = digest
+
+    # Upload the configs that are not staged yet, all in one SFTP session; returns their hashes
+    def stage(self, ip_address, username, password, path, local_paths, remote_config_paths=()):
+        hashes = {local_path: file_sha256(local_path) for local_path in local_paths}
+        with self._host_lock(ip_address, path):
+            with self.ssh_pool.connection(ip_address, username, password) as client:
+                if (ip_address, path) not in self._staged:
+                    self._load_manifest(client, ip_address, path, remote_config_paths)
+                staged = self._staged[(ip_address, path)]
+                missing = {digest: local_path for local_path, digest in hashes.items() if digest not in staged}
+                if missing:
+                    sftp = client.open_sftp()
+                    try:
+                        for digest, local_path in missing.items():
+                            remote_path = f"{path}/{STAGE_DIR}/{digest}.yaml"
+                            # Upload under a temporary name so a broken transfer never looks staged
+                            sftp.put(local_path, f"{remote_path}.tmp")
+                            sftp.posix_rename(f"{remote_path}.tmp", remote_path)
+                            staged.add(digest)
+                    finally:
+                        sftp.close()
+                    logger.info(f"Staged {len(missing)} config file(s) on {ip_address} ({len(hashes) - len(missing)} already staged)")
+        return hashes
+
+    # Make the local config the active remote config
+    # A staged copy is selected with a remote cp; a config that is not staged (e.g. generated by the test case
+    # itself) is uploaded straight to the remote config path, one SFTP session like an unstaged upload.
+    # Returns False when the remote config already had this content (nothing was done)
+    def select(self, ip_address, username, password, path, local_path, remote_config_path):
+        digest = file_sha256(local_path)
+        with self._host_lock(ip_address, path):
+            with self.ssh_pool.connection(ip_address, username, password) as client:
+                if (ip_address, path) not in self._staged:
+                    self._load_manifest(client, ip_address, path, [remote_config_path])
+                if self._selected.get((ip_address, remote_config_path)) == digest:
+                    return False
+                if digest in self._staged[(ip_address, path)]:
+                    staged_path = shlex.quote(f"{path}/{STAGE_DIR}/{digest}.yaml")
+                    self._exec(client, f"cp -f {staged_path} {shlex.quote(remote_config_path)}")
+                else:
+                    sftp = client.open_sftp()
+                    try:
+                        sftp.put(local_path, f"{remote_config_path}.tmp")
+                        sftp.posix_rename(f"{remote_config_path}.tmp", remote_config_path)
+                    finally:
+                        sftp.close()
+            self._selected[(ip_address, remote_config_path)] = digest
+        return True
@@ -6,31 +6,56 @@ from datetime import datetime
 import threading as _threading
 
 # Step logging state
+# The current test case is tracked per thread so that test cases scheduled in
+# parallel keep their steps and logs apart; the current step is kept per test case.
 _step_log_state = {
-    'current_testcase': None,
-    'current_step': None,
-    'testcases': {},  # testcase_id: {steps: [step dicts], description: str}
+    'local': _threading.local(),
+    'testcases': {},  # testcase_id: {steps: [step dicts], description: str, current_step: step dict}
     'lock': _threading.Lock()
 }
 
+# Get the test case ID bound to the calling thread
+def get_current_testcase():
+    return getattr(_step_log_state['local'], 'testcase_id', None)
+
+# Bind a test case ID to the calling thread (used by helper threads of a test case)
+def set_current_testcase(testcase_id):
+    _step_log_state['local'].testcase_id = testcase_id
+
+# Get the step currently running for the test case bound to the calling thread
+def get_current_step():
+    tcdata = _step_log_state['testcases'].get(get_current_testcase())
+    return tcdata.get('current_step') if tcdata else None
+
+# Reserve report entries so test cases are reported in declared order, whatever order they finish in
+def reserve_testcases(testcase_ids):
+    with _step_log_state['lock']:
+        for testcase_id in testcase_ids:
+            _step_log_state['testcases'].setdefault(testcase_id, {
+                'steps': [],
+                'description': None,
+                'current_step': None
+            })
+
 # Start a new test case
 def start_testcase(testcase_id, testcase_description=None):
     with _step_log_state['lock']:
-        _step_log_state['current_testcase'] = testcase_id
+        set_current_testcase(testcase_id)
         _step_log_state['testcases'][testcase_id] = {
             'steps': [],
-            'description': testcase_description
+            'description': testcase_description,
+            'current_step': None
         }
 
 # End the current test case
 def end_testcase(testcase_id):
     with _step_log_state['lock']:
-        _step_log_state['current_testcase'] = None
+        set_current_testcase(None)
 
 # Get the current test case ID
 @contextmanager
 def log_step(keyword):
-    testcase_id = _step_log_state['current_testcase']
+    testcase_id = get_current_testcase()
     start_time = datetime.now()
     step = {
         'keyword': keyword,
@@ -40,7 +65,7 @@ def log_step(keyword):
         'logs': []
     }
     with _step_log_state['lock']:
-        _step_log_state['current_step'] = step
+        _step_log_state['testcases'][testcase_id]['current_step'] = step
         _step_log_state['testcases'][testcase_id]['steps'].append(step)
     try:
         yield
@@ -51,12 +76,12 @@ def log_step(keyword):
     finally:
         step['end'] = datetime.now()
         with _step_log_state['lock']:
-            _step_log_state['current_step'] = None
+            _step_log_state['testcases'][testcase_id]['current_step'] = None
 
 # Log a message to the current step
 def log_to_step(msg):
     with _step_log_state['lock']:
-        step = _step_log_state['current_step']
+        step = get_current_step()
         if step:
             step['logs'].append(msg)
 
@@ -382,7 +407,7 @@ class UnifiedHtmlHandler(logging.Handler):
     def _log_to_step(self, msg):
         """Add log message to current step's logs."""
         with self.step_log_state['lock']:
-            step = self.step_log_state['current_step']
+            step = get_current_step()
             if step:
                 step['logs'].append(msg)
 
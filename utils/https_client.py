@@ -0,0 +1,164 @@
+import ssl
+import time
+import select
+import socket
+import logging
+import threading
+import http.client
+from collections import namedtuple
+
+logger = logging.getLogger("AutomationLogger")
+
+# Timing of a single request in seconds. connect and tls_handshake are 0.0 when a kept-alive connection was reused
+RequestTiming = namedtuple("RequestTiming", ["connect", "tls_handshake", "ttfb", "total", "reused", "session_reused"])
+
+# Errors showing that the server closed a kept-alive connection
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, ssl.SSLEOFError)
+# Methods that are safe to send again when a kept-alive connection turns out to be closed
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+# HTTPS connection that measures TCP connect and TLS handshake time and resumes a previous TLS session
+class _TimedHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, host, port, context, tls_session=None, timeout=30):
+        super().__init__(host, port, context=context, timeout=timeout)
+        self.tls_session = tls_session
+        self.connect_time = 0.0
+        self.tls_time = 0.0
+
+    def connect(self):
+        t0 = time.perf_counter()
+        sock = socket.create_connection((self.host, self.port), self.timeout, self.source_address)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        t1 = time.perf_counter()
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host, session=self.tls_session)
+        t2 = time.perf_counter()
+        self.connect_time = t1 - t0
+        self.tls_time = t2 - t1
+
+
+# This function checks that an idle kept-alive connection is still open
+# An idle connection has nothing to read; if its socket is readable the server closed it (EOF or close_notify)
+def _is_alive(conn):
+    sock = conn.sock
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return False
+    return not readable and not sock.pending()
+
+
+# This class keeps HTTPS connections alive per (host, port) and reuses one SSLContext per client certificate
+# New connections resume the last TLS session of the same host, so only the first connection pays a full
+# mTLS handshake. Timing of the last request of the calling thread is available through last_timing().
+class HTTPSClientPool:
+    def __init__(self, max_idle_per_host=4, timeout=30):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._contexts = {}
+        self._idle = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # Get the SSLContext for a client certificate, loading the cert chain only once
+    def _get_context(self, client_crt, client_key, client_ca):
+        key = (client_crt, client_key, client_ca)
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is None:
+                context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=client_ca)
+                context.load_cert_chain(certfile=client_crt, keyfile=client_key)
+                self._contexts[key] = context
+        return context
+
+    # Take an idle connection for the host, or create a new one resuming the last TLS session
+    # Idle connections the server has closed meanwhile (idle timeout, ALG restart) are dropped
+    def _checkout(self, pool_key, host, port, context):
+        while True:
+            with self._lock:
+                idle = self._idle.get(pool_key)
+                conn = idle.pop() if idle else None
+                session = self._sessions.get(pool_key)
+            if conn is None:
+                return _TimedHTTPSConnection(host, port, context, session, self.timeout), False
+            if _is_alive(conn):
+                return conn, True
+            logger.debug(f"Dropping closed keep-alive connection to {host}:{port}")
+            conn.close()
+
+    # Return a connection to the idle list, keeping its TLS session for future connections
+    def _checkin(self, pool_key, conn, session, keep_alive):
+        with self._lock:
+            if session is not None:
+                self._sessions[pool_key] = session
+            idle = self._idle.setdefault(pool_key, [])
+            if keep_alive and conn.sock is not None and len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    # Send a request on a connection and return the response; the connection is closed on failure
+    @staticmethod
+    def _send(conn, method, path, body, headers):
+        try:
+            conn.connect_time = conn.tls_time = 0.0
+            conn.request(method, path, body=body, headers=headers)
+            return conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+
+    # Send a request and return (status, response body, RequestTiming)
+    # If a kept-alive connection was closed by the server, an idempotent request is sent once more on a new
+    # connection. Other methods (POST, PATCH) are not replayed: the server may have applied the request before
+    # the connection dropped, e.g. installed a filter rule, so the error is raised to the caller instead.
+    def request(self, host, port, method, path, body, headers, client_crt, client_key, client_ca):
+        context = self._get_context(client_crt, client_key, client_ca)
+        pool_key = (host, int(port), client_crt, client_key, client_ca)
+        method = method.upper()
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        conn, reused = self._checkout(pool_key, host, int(port), context)
+        start = time.perf_counter()
+        try:
+            response = self._send(conn, method, path, body, headers)
+        except _STALE_CONNECTION_ERRORS:
+            if not reused or method not in _IDEMPOTENT_METHODS:
+                raise
+            logger.debug(f"Kept-alive connection to {host}:{port} was closed, sending {method} {path} again")
+            with self._lock:
+                session = self._sessions.get(pool_key)
+            conn, reused = _TimedHTTPSConnection(host, int(port), context, session, self.timeout), False
+            start = time.perf_counter()
+            response = self._send(conn, method, path, body, headers)
+        ttfb = time.perf_counter() - start - conn.connect_time - conn.tls_time
+        # Take the TLS session before reading the body, the socket is released once a closing response is read
+        session = conn.sock.session if conn.sock is not None else None
+        session_reused = bool(conn.sock is not None and conn.sock.session_reused)
+        try:
+            data = response.read().decode()
+        except Exception:
+            conn.close()
+            raise
+        total = time.perf_counter() - start
+
+        timing = RequestTiming(conn.connect_time, conn.tls_time, ttfb, total, reused, session_reused)
+        self._local.last_timing = timing
+        self._checkin(pool_key, conn, session, keep_alive=not response.will_close)
+        return response.status, data, timing
+
+    # Timing of the last request sent by the calling thread
+    def last_timing(self):
+        return getattr(self._local, "last_timing", None)
+
+    # Close all idle connections, e.g. after the server was restarted
+    def close_all(self):
+        with self._lock:
+            connections = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,121 @@
+import json
+import base64
+import time
+import zlib
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger("AutomationLogger")
+
+# Size of the reads from the remote gzip stream
+_RECV_SIZE = 65536
+_CURSOR_PREFIX = b"-- cursor: "
+
+# A position in the journal: the cursor of the newest entry (None if the journal had no entries)
+# and the local time the mark was taken
+JournalMark = namedtuple("JournalMark", ["cursor", "timestamp"])
+
+
+# This function returns the journalctl option selecting the entries after a position
+# The position is a JournalMark, a cursor string or a "%Y-%m-%d %H:%M:%S" time
+def journal_position(position):
+    if isinstance(position, JournalMark):
+        position = position.cursor
+        if position is None:
+            return ""
+        return f"--after-cursor '{position}'"
+    return f'--since "{position}"'
+
+
+# This function returns the command printing the newest journal entry of a unit as JSON (see parse_cursor)
+def cursor_command(unit):
+    return f"journalctl --no-pager -q -u {unit} -n 1 -o json --output-fields=__CURSOR"
+
+
+# This function extracts the cursor from the output of cursor_command(), None if the journal has no entries
+def parse_cursor(output):
+    output = output.strip()
+    if not output:
+        return None
+    return json.loads(output.splitlines()[-1])["__CURSOR"]
+
+
+# This function reads the cursor of the newest journal entry of a unit on the remote host
+def query_cursor(client, unit):
+    channel = client.get_transport().open_session()
+    try:
+        channel.exec_command(cursor_command(unit))
+        output = channel.makefile('r').read().decode('utf-8', errors='replace')
+    finally:
+        channel.close()
+    return parse_cursor(output)
+
+
+# This function returns the command printing the gzip compressed journal entries of a unit after a position
+# With text_safe=True the output is base64 encoded, so it can be part of a batch of commands (see decode_journal)
+def journal_command(unit, position, until=None, text_safe=False):
+    command = f"journalctl --no-pager -q -u {unit} {journal_position(position)} --show-cursor"
+    if until is not None:
+        command += f' --until "{until}"'
+    command += " | gzip -c"
+    if text_safe:
+        command += " | base64 -w0"
+    return command
+
+
+# This function decompresses gzip blocks of journal output to `destination` (a binary file) as they come
+# The trailing "-- cursor:" line is not written. Returns (cursor or None, uncompressed bytes, compressed bytes)
+def write_journal(blocks, destination):
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pending = b""
+    held = None  # the last complete line is held back until we know it is not the cursor line
+    written = transferred = 0
+    for data in blocks:
+        transferred += len(data)
+        lines = (pending + decompressor.decompress(data)).split(b"\n")
+        pending = lines.pop()
+        if lines:
+            if held is not None:
+                lines.insert(0, held)
+            held = lines.pop()
+            if lines:
+                block = b"\n".join(lines) + b"\n"
+                destination.write(block)
+                written += len(block)
+    pending += decompressor.flush()
+
+    cursor = None
+    # held lost its newline to the split; pending is the unterminated tail of the stream
+    for line, ending in ((held, b"\n"), (pending, b"")):
+        if line is None or not (line or ending):
+            continue
+        if line.startswith(_CURSOR_PREFIX):
+            cursor = line[len(_CURSOR_PREFIX):].strip().decode()
+        else:
+            destination.write(line + ending)
+            written += len(line) + len(ending)
+    return cursor, written, transferred
+
+
+# This function writes the output of journal_command(text_safe=True) to `destination`, see write_journal()
+def decode_journal(output, destination):
+    output = output.strip()
+    return write_journal([base64.b64decode(output)] if output else [], destination)
+
+
+# This function fetches the journal entries of a unit after a position, gzip compressed on the remote host
+# The stream is decompressed while it arrives and written to `destination` (a binary file).
+# Returns (cursor of the last entry or None if there were none, uncompressed bytes, transferred bytes)
+def fetch_journal(client, unit, position, destination, until=None):
+    channel = client.get_transport().open_session()
+    start = time.monotonic()
+    try:
+        channel.exec_command(journal_command(unit, position, until))
+        cursor, written, transferred = write_journal(iter(lambda: channel.recv(_RECV_SIZE), b""), destination)
+        error = channel.makefile_stderr('r').read().decode('utf-8', errors='replace')
+        if error:
+            logger.warning(f"Remote journal fetch error: {error}")
+    finally:
+        channel.close()
+    logger.debug(f"Fetched {written} bytes of {unit} journal ({transferred} bytes transferred) in {time.monotonic() - start:.2f} seconds")
+    return cursor, written, transferred
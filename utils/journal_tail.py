@@ -0,0 +1,279 @@
+import json
+import time
+import bisect
+import socket
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger("AutomationLogger")
+
+# Size of the reads from the journal stream
+_RECV_SIZE = 65536
+# Size of the blocks copied out of the spool file
+_COPY_SIZE = 1024 * 1024
+
+
+# This function runs a short command on a pooled SSH connection and returns its output
+def _exec(client, command):
+    channel = client.get_transport().open_session()
+    try:
+        channel.exec_command(command)
+        return channel.makefile('r').read().decode('utf-8', errors='replace')
+    finally:
+        channel.close()
+
+
+# This function renders a journal JSON record like the default 'journalctl' short output
+def _format_record(record, remote_seconds):
+    message = record.get("MESSAGE", "")
+    if isinstance(message, list):
+        # journald sends non UTF-8 messages as a list of byte values
+        message = bytes(message).decode('utf-8', errors='replace')
+    message = str(message).replace("\n", "\n    ")
+    identifier = record.get("SYSLOG_IDENTIFIER") or record.get("_COMM", "")
+    pid = record.get("_PID")
+    source = f"{identifier}[{pid}]" if pid else identifier
+    stamp = time.strftime("%b %d %H:%M:%S", time.localtime(remote_seconds))
+    return f"{stamp} {record.get('_HOSTNAME', '')} {source}: {message}\n"
+
+
+# This class holds one per-test log file that receives journal lines as they arrive
+class _Window:
+    def __init__(self, path, since):
+        self.path = path
+        self.since = since
+        self.until = None
+        self.file = open(path, "wb")
+
+    def accepts(self, timestamp):
+        return timestamp >= self.since and (self.until is None or timestamp <= self.until)
+
+
+# This class follows the journal of a systemd unit over a single SSH channel for the whole run
+# Every record is appended to a spool file; the local timestamp and spool offset of each record are kept
+# in memory, so any time window can be written out without querying the remote host again.
+# Open windows receive their lines as soon as they arrive. Record timestamps are converted to the local
+# clock with the offset measured against the remote 'date' when the tail is started.
+class JournalTail:
+    def __init__(self, ssh_pool, ip_address, username, password, spool_path, unit="alggo", port=22, barrier_timeout=5.0):
+        self.ssh_pool = ssh_pool
+        self.ip_address = ip_address
+        self.username = username
+        self.password = password
+        self.port = port
+        self.spool_path = spool_path
+        self.unit = unit
+        self.barrier_timeout = barrier_timeout
+        self.clock_offset = 0.0
+        self._client = None
+        self._channel = None
+        self._thread = None
+        self._spool = None
+        self._spool_size = 0
+        self._timestamps = array('d')
+        self._offsets = array('q')
+        self._last_remote_us = 0
+        self._cursor = None
+        self._windows = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # Measure remote clock minus local clock, using the midpoint of the round trip
+    def _measure_clock_offset(self):
+        before = time.time()
+        remote = float(_exec(self._client, "date +%s.%N").strip())
+        after = time.time()
+        return remote - (before + after) / 2
+
+    # Open the follow stream; resumes after the last seen record when reconnecting
+    def _open_stream(self, position):
+        self._channel = self._client.get_transport().open_session()
+        self._channel.settimeout(1.0)
+        self._channel.exec_command(f"journalctl --no-pager -u {self.unit} -f -o json {position}")
+
+    # Connect, measure the clock offset and start following the journal
+    def start(self):
+        self._client = self.ssh_pool.acquire(self.ip_address, self.username, self.password, self.port)
+        self.clock_offset = self._measure_clock_offset()
+        logger.debug(f"Clock offset of {self.ip_address}: {self.clock_offset:+.3f} seconds")
+        self._spool = open(self.spool_path, "wb")
+        self._open_stream(f"--since @{int(time.time() + self.clock_offset) - 1}")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"journal-tail-{self.unit}", daemon=True)
+        self._thread.start()
+        logger.info(f"Streaming {self.unit} journal of {self.ip_address} to {self.spool_path}")
+
+    # Reader thread: split the stream into JSON records and store them
+    def _run(self):
+        pending = b""
+        while not self._stop.is_set():
+            try:
+                data = self._channel.recv(_RECV_SIZE)
+            except socket.timeout:
+                continue
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.warning(f"Journal stream of {self.ip_address} failed: {e}")
+                data = b""
+            if not data:
+                if self._stop.is_set() or not self._reconnect():
+                    break
+                pending = b""
+                continue
+            lines = (pending + data).split(b"\n")
+            pending = lines.pop()
+            self._ingest(lines)
+
+    # Re-open the stream after the last seen record, so nothing is lost or duplicated
+    def _reconnect(self):
+        try:
+            self._channel.close()
+            time.sleep(1)
+            position = f"--after-cursor '{self._cursor}'" if self._cursor else f"--since @{int(time.time() + self.clock_offset) - 1}"
+            self._open_stream(position)
+            logger.info(f"Journal stream of {self.ip_address} re-opened")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to re-open journal stream of {self.ip_address}: {e}")
+            return False
+
+    # Append a batch of records to the spool and to the open windows
+    def _ingest(self, lines):
+        with self._cond:
+            for raw in lines:
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    logger.debug(f"Skipping malformed journal record: {raw[:200]}")
+                    continue
+                remote_us = int(record.get("__REALTIME_TIMESTAMP", 0))
+                timestamp = remote_us / 1e6 - self.clock_offset
+                # Keep the index sorted so windows can be located with bisect
+                if self._timestamps and timestamp < self._timestamps[-1]:
+                    timestamp = self._timestamps[-1]
+                data = _format_record(record, remote_us / 1e6).encode('utf-8')
+                self._timestamps.append(timestamp)
+                self._offsets.append(self._spool_size)
+                self._spool.write(data)
+                self._spool_size += len(data)
+                for window in self._windows.values():
+                    if window.accepts(timestamp):
+                        window.file.write(data)
+                self._last_remote_us = max(self._last_remote_us, remote_us)
+                self._cursor = record.get("__CURSOR", self._cursor)
+            self._spool.flush()
+            for window in self._windows.values():
+                window.file.flush()
+            self._cond.notify_all()
+
+    # Wait until every record written to the remote journal so far has been received
+    # Returns False if the stream did not catch up within the timeout
+    def barrier(self, timeout=None):
+        timeout = self.barrier_timeout if timeout is None else timeout
+        with self.ssh_pool.connection(self.ip_address, self.username, self.password, self.port) as client:
+            output = _exec(client, f"journalctl --no-pager -u {self.unit} -n 1 -o json --output-fields=__REALTIME_TIMESTAMP")
+        try:
+            target_us = int(json.loads(output.strip().splitlines()[-1])["__REALTIME_TIMESTAMP"])
+        except (IndexError, KeyError, ValueError):
+            return True
+        with self._cond:
+            caught_up = self._cond.wait_for(lambda: self._last_remote_us >= target_us or not self.active, timeout)
+        if not caught_up:
+            logger.warning(f"Journal stream of {self.ip_address} did not catch up within {timeout} seconds")
+        return caught_up
+
+    # Spool byte range of the records between since and until (local epoch seconds)
+    def _range(self, since, until=None):
+        start_index = bisect.bisect_left(self._timestamps, since)
+        end_index = len(self._timestamps) if until is None else bisect.bisect_right(self._timestamps, until)
+        start = self._offsets[start_index] if start_index < len(self._offsets) else self._spool_size
+        end = self._offsets[end_index] if end_index < len(self._offsets) else self._spool_size
+        return start, max(start, end)
+
+    # Copy a byte range of the spool file to an open file
+    def _copy_range(self, start, end, destination):
+        with open(self.spool_path, "rb") as spool:
+            spool.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                block = spool.read(min(_COPY_SIZE, remaining))
+                if not block:
+                    break
+                destination.write(block)
+                remaining -= len(block)
+
+    # Start writing the records from `since` (default now) to a file as they arrive
+    def open_window(self, key, path, since=None):
+        since = time.time() if since is None else since
+        with self._cond:
+            window = _Window(path, since)
+            start, end = self._range(since)
+            self._copy_range(start, end, window.file)
+            window.file.flush()
+            self._windows[key] = window
+
+    # Cursor of the last record received
+    @property
+    def cursor(self):
+        with self._cond:
+            return self._cursor
+
+    def has_window(self, key):
+        with self._cond:
+            return key in self._windows
+
+    # Stop a window at `until` (default now) once the stream has caught up, and close its file
+    def close_window(self, key, until=None):
+        with self._cond:
+            window = self._windows.get(key)
+            if window is None:
+                return None
+            window.until = time.time() if until is None else until
+        self.barrier()
+        with self._cond:
+            self._windows.pop(key, None)
+            window.file.close()
+        return window.path
+
+    # Write the records between since and until (local epoch seconds) to a file
+    def export(self, path, since, until=None):
+        self.barrier()
+        with self._cond:
+            start, end = self._range(since, until)
+        with open(path, "wb") as f:
+            self._copy_range(start, end, f)
+        return end - start
+
+    # Check if a record received since `since` contains the text, without querying the remote host
+    def contains(self, text, since):
+        needle = text.encode('utf-8')
+        with self._cond:
+            start, end = self._range(since)
+        with open(self.spool_path, "rb") as spool:
+            spool.seek(start)
+            return needle in spool.read(end - start)
+
+    # Stop following the journal and close all files
+    def stop(self):
+        self._stop.set()
+        if self._channel is not None:
+            self._channel.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._cond:
+            for window in self._windows.values():
+                window.file.close()
+            self._windows.clear()
+            if self._spool is not None:
+                self._spool.close()
+        if self._client is not None:
+            self.ssh_pool.release(self._client)
+            self._client = None
@@ -0,0 +1,293 @@
+import os
+import re
+import mmap
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger("AutomationLogger")
+
+# Size of the blocks the log file is scanned in
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Files at least this large are searched through mmap by default
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Line breaks recognized by text mode (universal newlines): \r\n, a lone \r and \n
+_LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+
+
+# This class describes one expectation on a log file
+# A line counts once when it contains the literal (or matches the regex), like search_string_in_file.
+# expected_count None means "at least once", an integer means exactly that many lines (0 = must not appear)
+class LogAssertion:
+    def __init__(self, pattern, expected_count=None, use_regex=False):
+        self.pattern = pattern
+        self.expected_count = expected_count
+        self.use_regex = use_regex
+
+    @property
+    def key(self):
+        return (self.pattern, self.use_regex)
+
+    # Check a line count against the expectation
+    def check(self, count):
+        if self.expected_count is None:
+            return count > 0
+        return count == self.expected_count
+
+    def __str__(self):
+        expected = "at least 1" if self.expected_count is None else self.expected_count
+        return f"[{self.pattern}] expected {expected}"
+
+
+# This class holds the pass/fail result of every assertion verified on a log file
+class LogReport:
+    def __init__(self, file_path, results):
+        self.file_path = file_path
+        self.results = results  # list of (LogAssertion, count, passed)
+
+    @property
+    def passed(self):
+        return all(passed for _, _, passed in self.results)
+
+    @property
+    def failures(self):
+        return [f"{assertion} - found {count}" for assertion, count, passed in self.results if not passed]
+
+    def __str__(self):
+        lines = [f"Log verification of {self.file_path}: {'PASS' if self.passed else 'FAIL'}"]
+        for assertion, count, passed in self.results:
+            lines.append(f"  {'PASS' if passed else 'FAIL'} - {assertion} - found {count}")
+        return "\n".join(lines)
+
+
+# This class matches many literals and regexes against a text in a single scan
+# All patterns are combined into one alternation that finds candidate lines; only candidate lines are
+# checked against the individual patterns. A per-line match is always also a match of the alternation at
+# the same position or earlier, so scanning from line to line never skips a matching line.
+# Regexes with groups, backreferences or inline global flags cannot share an alternation (their group
+# numbers and flags would apply to the whole of it), so each of those gets a scan of its own.
+# With binary=True the patterns are matched on UTF-8 bytes, so feed() accepts bytes or an mmap.
+class MultiPatternMatcher:
+    def __init__(self, literals=(), regexes=(), binary=False):
+        self.literals = list(dict.fromkeys(literals))
+        self.regexes = list(dict.fromkeys(regexes))
+        encode = (lambda text: text.encode("utf-8")) if binary else (lambda text: text)
+        self._newline = encode("\n")
+        literal_checks = [(literal, encode(literal)) for literal in self.literals]
+        regex_checks = [(pattern, re.compile(encode(pattern))) for pattern in self.regexes]
+        combined = [check for check in regex_checks if _combinable(check[1])]
+        separate = [check for check in regex_checks if not _combinable(check[1])]
+        # Scans as (candidate regex, literal checks, regex checks)
+        self._scans = []
+        literal_alternatives = [re.escape(encode(literal)) for literal in sorted(self.literals, key=len, reverse=True)]
+        regex_alternatives = [encode("(?:") + regex.pattern + encode(")") for _, regex in combined]
+        try:
+            candidates = _alternation(literal_alternatives + regex_alternatives, encode)
+        except re.error as e:
+            logger.debug(f"Regexes cannot be combined, scanning them one by one: {e}")
+            candidates = _alternation(literal_alternatives, encode)
+            separate = combined + separate
+            combined = []
+        if candidates is not None:
+            self._scans.append((candidates, literal_checks, combined))
+        self._scans += [(re.compile(regex.pattern, re.MULTILINE), [], [(pattern, regex)]) for pattern, regex in separate]
+        self.counts = {(literal, False): 0 for literal in self.literals}
+        self.counts.update({(pattern, True): 0 for pattern in self.regexes})
+
+    # Count the matching lines of a block of complete lines
+    def feed(self, text):
+        for candidates, literal_checks, regex_checks in self._scans:
+            self._scan(text, candidates, literal_checks, regex_checks)
+
+    def _scan(self, text, candidates, literal_checks, regex_checks):
+        pos = 0
+        size = len(text)
+        newline = self._newline
+        search = candidates.search
+        counts = self.counts
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return
+            line_start = text.rfind(newline, 0, match.start()) + 1
+            line_end = text.find(newline, match.start())
+            line_end = size if line_end == -1 else line_end + 1
+            line = text[line_start:line_end]
+            for literal, needle in literal_checks:
+                if needle in line:
+                    counts[(literal, False)] += 1
+            for pattern, regex in regex_checks:
+                if regex.search(line):
+                    counts[(pattern, True)] += 1
+            if line_end >= size:
+                return
+            pos = line_end
+
+
+# This function compiles alternatives into one multiline regex, None if there are none
+def _alternation(alternatives, encode):
+    return re.compile(encode("|").join(alternatives), re.MULTILINE) if alternatives else None
+
+
+# This function tells if a compiled regex can be part of an alternation: no groups and no inline flags
+def _combinable(regex):
+    return regex.groups == 0 and not regex.flags & ~re.UNICODE
+
+
+# This function feeds a whole file to a matcher in blocks of complete lines
+def _scan_text_file(file_path, matcher):
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        remainder = ""
+        while True:
+            chunk = file.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunk = remainder + chunk
+            last_newline = chunk.rfind("\n")
+            if last_newline == -1:
+                remainder = chunk
+                continue
+            matcher.feed(chunk[:last_newline + 1])
+            remainder = chunk[last_newline + 1:]
+        if remainder:
+            matcher.feed(remainder)
+
+
+# This function verifies a list of LogAssertion on a file in one pass and returns a LogReport
+# use_mmap None maps files of MMAP_THRESHOLD bytes or more and matches them as raw UTF-8 bytes
+def verify_log(file_path, assertions, use_mmap=None):
+    if use_mmap is None:
+        use_mmap = os.path.getsize(file_path) >= MMAP_THRESHOLD
+    matcher = MultiPatternMatcher(
+        literals=[a.pattern for a in assertions if not a.use_regex],
+        regexes=[a.pattern for a in assertions if a.use_regex],
+        binary=use_mmap
+    )
+    if use_mmap:
+        with open(file_path, 'rb') as file:
+            buffer = _map_file(file)
+            if buffer is not None:
+                with buffer:
+                    for block in _normalized_blocks(buffer):
+                        matcher.feed(block)
+    else:
+        _scan_text_file(file_path, matcher)
+
+    results = []
+    for assertion in assertions:
+        count = matcher.counts[assertion.key]
+        passed = assertion.check(count)
+        results.append((assertion, count, passed))
+        if passed:
+            logger.info(f"Success - {assertion} - found {count} times in {file_path}")
+        else:
+            logger.warning(f"Failed - {assertion} - found {count} times in {file_path}")
+    return LogReport(file_path, results)
+
+
+# This function compiles a search pattern to a bytes regex once per pattern
+# `scan` is used to find candidates in the whole buffer, `line` confirms a candidate on its own line
+@lru_cache(maxsize=256)
+def _compile_bytes_pattern(pattern, use_regex):
+    raw = pattern.encode("utf-8")
+    if not use_regex:
+        raw = re.escape(raw)
+    return re.compile(raw, re.MULTILINE), re.compile(raw)
+
+
+# This function compiles a str regex once per pattern
+@lru_cache(maxsize=256)
+def compile_pattern(pattern):
+    return re.compile(pattern)
+
+
+# This function yields (line start, line end) of every line of a buffer that contains the pattern
+# Works on raw bytes: a literal is found with find(), a regex is searched in the whole buffer and each hit is
+# confirmed on its own line, so a match spanning a line break is never counted.
+def _iter_matching_line_spans(buffer, pattern, use_regex):
+    size = len(buffer)
+    pos = 0
+    if not use_regex:
+        needle = pattern.encode("utf-8")
+        if not needle:
+            return
+        while pos < size:
+            index = buffer.find(needle, pos)
+            if index == -1:
+                return
+            line_start = buffer.rfind(b"\n", 0, index) + 1
+            line_end = buffer.find(b"\n", index)
+            line_end = size if line_end == -1 else line_end + 1
+            yield line_start, line_end
+            pos = line_end
+        return
+
+    scan, line_regex = _compile_bytes_pattern(pattern, True)
+    while pos < size:
+        match = scan.search(buffer, pos)
+        if match is None:
+            return
+        line_start = buffer.rfind(b"\n", 0, match.start()) + 1
+        line_end = buffer.find(b"\n", match.start())
+        line_end = size if line_end == -1 else line_end + 1
+        if line_regex.search(buffer[line_start:line_end]):
+            yield line_start, line_end
+        pos = line_end
+
+
+# This function memory-maps a file for reading, returning None for an empty file (which cannot be mapped)
+def _map_file(file):
+    if os.fstat(file.fileno()).st_size == 0:
+        return None
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# This function yields a mapped file as blocks of complete lines that only break on b"\n"
+# Text mode reads with universal newlines, so \r\n and a lone \r end a line there as well. A buffer with CRs is
+# cut at line breaks and each block is normalized, so both modes count the same lines; a buffer without CRs is
+# yielded as it is.
+def _normalized_blocks(buffer):
+    if buffer.find(b"\r") == -1:
+        yield buffer
+        return
+    size = len(buffer)
+    start = 0
+    while start < size:
+        end = size
+        if start + _CHUNK_SIZE < size:
+            match = _LINE_BREAK.search(buffer, start + _CHUNK_SIZE - 1)
+            if match is not None:
+                end = match.end()
+        yield buffer[start:end].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        start = end
+
+
+# This function counts the lines of a block containing the literal (or matching the regex)
+# Count-only fast path: for a literal only the position of each hit and the following newline are looked up
+def _count_matching_lines(buffer, pattern, use_regex):
+    if not use_regex:
+        needle = pattern.encode("utf-8")
+        if not needle:
+            return 0
+        count = 0
+        pos = 0
+        while True:
+            index = buffer.find(needle, pos)
+            if index == -1:
+                return count
+            count += 1
+            pos = buffer.find(b"\n", index) + 1
+            if pos == 0:
+                return count
+    return sum(1 for _ in _iter_matching_line_spans(buffer, pattern, True))
+
+
+# This function counts the lines of a file containing the literal (or matching the regex) without decoding it
+def count_matching_lines(file_path, pattern, use_regex=False):
+    with open(file_path, 'rb') as file:
+        buffer = _map_file(file)
+        if buffer is None:
+            return 0
+        with buffer:
+            return sum(_count_matching_lines(block, pattern, use_regex) for block in _normalized_blocks(buffer))
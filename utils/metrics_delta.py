@@ -0,0 +1,191 @@
+import math
+import logging
+from .prometheus import interval_quantiles
+
+logger = logging.getLogger("AutomationLogger")
+
+
+# This class describes one expectation on the change of a metric between the first and last snapshot
+# Built from an entry of "metrics_to_validate" in the expected values file:
+#   {"field": f, "expected_diff": n}                                  - f increased by exactly n
+#   {"field": f, "min_diff": a, "max_diff": b}                        - f increased by a to b (either may be left out)
+#   {"field": f, "ratio_to": g, "expected_ratio": r, "tolerance": t}  - increase of f / increase of g is r, +- t relative
+class MetricExpectation:
+    def __init__(self, field, expected_diff=None, min_diff=None, max_diff=None, ratio_to=None, expected_ratio=None, tolerance=0.0):
+        self.field = field
+        self.expected_diff = expected_diff
+        self.min_diff = min_diff
+        self.max_diff = max_diff
+        self.ratio_to = ratio_to
+        self.expected_ratio = expected_ratio
+        self.tolerance = tolerance
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(entry["field"], entry.get("expected_diff"), entry.get("min_diff"), entry.get("max_diff"),
+                   entry.get("ratio_to"), entry.get("expected_ratio"), entry.get("tolerance", 0.0))
+
+    # Lowest and highest accepted value
+    def bounds(self):
+        if self.ratio_to is not None:
+            ratio = float(self.expected_ratio)
+            spread = abs(ratio) * float(self.tolerance)
+            return ratio - spread, ratio + spread
+        if self.expected_diff is not None:
+            return float(self.expected_diff), float(self.expected_diff)
+        return (-math.inf if self.min_diff is None else float(self.min_diff)), (math.inf if self.max_diff is None else float(self.max_diff))
+
+    def __str__(self):
+        if self.ratio_to is not None:
+            return f"[{self.field}] / [{self.ratio_to}] expected ratio {self.expected_ratio} (tolerance {self.tolerance})"
+        if self.expected_diff is not None:
+            return f"[{self.field}] expected diff {self.expected_diff}"
+        if self.max_diff is None:
+            return f"[{self.field}] expected diff of at least {self.min_diff}"
+        if self.min_diff is None:
+            return f"[{self.field}] expected diff of at most {self.max_diff}"
+        return f"[{self.field}] expected diff between {self.min_diff} and {self.max_diff}"
+
+
+# This class holds the pass/fail result of every metric expectation
+class MetricsReport:
+    def __init__(self, results):
+        self.results = results  # list of (MetricExpectation, actual value, passed)
+
+    @property
+    def passed(self):
+        return all(passed for _, _, passed in self.results)
+
+    @property
+    def failures(self):
+        return [f"{expectation} - got {_format(actual)}" for expectation, actual, passed in self.results if not passed]
+
+    def __str__(self):
+        lines = [f"Metrics validation: {'PASS' if self.passed else 'FAIL'}"]
+        for expectation, actual, passed in self.results:
+            lines.append(f"  {'PASS' if passed else 'FAIL'} - {expectation} - got {_format(actual)}")
+        return "\n".join(lines)
+
+
+# This class describes a latency SLO: a quantile of a histogram over the test interval must stay below a bound
+# Built from an entry of "latency_slos" in the expected values file, e.g. MML forward p99 below 5 ms:
+#   {"histogram": "alg_mml_forward_latency_seconds", "labels": {"direction": "downstream"}, "quantile": 0.99, "max": 0.005}
+# All series of the histogram matching the labels are added up; the bound is in the unit of the histogram.
+class LatencySLO:
+    def __init__(self, histogram, quantile, bound, labels=None):
+        self.histogram = histogram
+        self.quantile = float(quantile)
+        self.bound = float(bound)
+        self.labels = labels or {}
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(entry["histogram"], entry["quantile"], entry["max"], entry.get("labels"))
+
+    @property
+    def field(self):
+        labels = ",".join(f'{name}="{value}"' for name, value in sorted(self.labels.items()))
+        return f"{self.histogram}{{{labels}}}" if labels else self.histogram
+
+    def __str__(self):
+        return f"[{self.field}] p{self.quantile * 100:g} expected below {self.bound:g}"
+
+
+# This function checks latency SLOs between two Expositions (see parse_exposition); a histogram without
+# observations in the interval fails its SLO
+def check_latency_slos(before, after, slos):
+    results = []
+    for slo in slos:
+        slo = slo if isinstance(slo, LatencySLO) else LatencySLO.from_dict(slo)
+        value = interval_quantiles(before, after, slo.histogram, (slo.quantile,), slo.labels, merge=True)[slo.quantile]
+        results.append((slo, value, bool(value < slo.bound)))
+    return MetricsReport(results)
+
+
+def _format(value):
+    return "nothing" if math.isnan(value) else f"{value:g}"
+
+
+# This function converts metric values to a float array, NaN for values that are not numeric
+def _to_floats(values):
+    import numpy as np
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        floats = np.full(len(values), np.nan)
+        for index, value in enumerate(values):
+            try:
+                floats[index] = float(value)
+            except (TypeError, ValueError):
+                pass
+        return floats
+
+
+# This class aligns two or more metrics snapshots ({field: value}, e.g. from get_metrics_fields) into one
+# array with a row per snapshot and a column per field, so deltas, rates and expectations are computed for
+# all fields at once. Fields missing from a snapshot are NaN.
+# numpy is imported on first use, so the rest of the harness does not depend on it.
+class MetricsSnapshots:
+    def __init__(self, snapshots, timestamps=None):
+        import numpy as np
+        self.fields = sorted(set().union(*snapshots))
+        self.index = {field: column for column, field in enumerate(self.fields)}
+        self.values = np.full((len(snapshots), len(self.fields)), np.nan)
+        for row, snapshot in enumerate(snapshots):
+            columns = np.fromiter((self.index[field] for field in snapshot), dtype=np.intp, count=len(snapshot))
+            self.values[row, columns] = _to_floats(list(snapshot.values()))
+        self.timestamps = None if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+
+    # Change of every field from the first to the last snapshot
+    # With fill, a missing value counts as that value (a counter is only exported after its first increment)
+    def delta(self, fill=None):
+        import numpy as np
+        values = self.values if fill is None else np.where(np.isnan(self.values), fill, self.values)
+        return values[-1] - values[0]
+
+    # Change of one field, default if it is missing from the first or last snapshot
+    def delta_of(self, field, default=None, fill=None):
+        column = self.index.get(field)
+        if column is None:
+            return default
+        value = self.delta(fill)[column]
+        return default if math.isnan(value) else value
+
+    # Change of every field between consecutive snapshots
+    def deltas(self):
+        import numpy as np
+        return np.diff(self.values, axis=0)
+
+    # Per second change of every field between consecutive snapshots (needs the snapshot timestamps)
+    def rates(self):
+        import numpy as np
+        if self.timestamps is None:
+            raise ValueError("Snapshot timestamps are required for rates")
+        return self.deltas() / np.diff(self.timestamps)[:, None]
+
+    # Mask of the fields that never decrease, i.e. behave like counters
+    def counters(self):
+        import numpy as np
+        return np.all(self.deltas() >= 0, axis=0)
+
+    # Check all expectations in one pass; every expectation gets a result, so all mismatches are reported together
+    def check(self, expectations):
+        import numpy as np
+        expectations = [e if isinstance(e, MetricExpectation) else MetricExpectation.from_dict(e) for e in expectations]
+        if not expectations:
+            return MetricsReport([])
+        # Column -1 picks the NaN appended to the deltas, for fields that were never exported
+        delta = np.append(self.delta(fill=0.0), np.nan)
+        fields = np.array([self.index.get(e.field, -1) for e in expectations], dtype=np.intp)
+        references = np.array([self.index.get(e.ratio_to, -1) for e in expectations], dtype=np.intp)
+        is_ratio = np.array([e.ratio_to is not None for e in expectations])
+        low, high = np.array([e.bounds() for e in expectations], dtype=np.float64).T
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            actual = np.where(is_ratio, delta[fields] / delta[references], delta[fields])
+        passed = (actual >= low) & (actual <= high)
+        # Like before, a field that was never exported counts as unchanged
+        missing = (fields == -1) & ~is_ratio
+        actual[missing] = 0.0
+        passed[missing] = (low[missing] <= 0.0) & (high[missing] >= 0.0)
+        return MetricsReport([(e, float(a), bool(p)) for e, a, p in zip(expectations, actual, passed)])
@@ -0,0 +1,141 @@
+import csv
+import json
+import math
+import time
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger("AutomationLogger")
+
+
+# This class scrapes the ALG /metrics endpoint in the background and keeps a time series per metric
+# Every metric is one array('d') column aligned with the sample times; a metric that appears later is
+# back filled with NaN. Metrics that never decrease are treated as counters and get per second rates.
+class MetricsSampler:
+    def __init__(self, fetch, interval=1.0, name="metrics-sampler"):
+        self.fetch = fetch
+        self.interval = interval
+        self.name = name
+        self.errors = 0
+        self._times = array('d')
+        self._columns = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._times)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    # Stop sampling after one last scrape, so the series ends at the end of the test
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 30)
+            self._thread = None
+        self.sample()
+
+    def _run(self):
+        next_sample = time.monotonic()
+        while not self._stop.is_set():
+            self.sample()
+            # Keep a fixed schedule; a slow scrape skips ticks instead of drifting
+            next_sample += self.interval
+            now = time.monotonic()
+            if next_sample < now:
+                next_sample = now + self.interval - (now - next_sample) % self.interval
+            self._stop.wait(next_sample - now)
+
+    # Scrape once and append a row; returns False if the scrape failed
+    def sample(self):
+        timestamp = time.time()
+        try:
+            values = self.fetch()
+        except Exception as e:
+            values = None
+            logger.debug(f"Metrics scrape failed: {e}")
+        if not values:
+            self.errors += 1
+            return False
+        with self._lock:
+            count = len(self._times)
+            self._times.append(timestamp)
+            for key, column in self._columns.items():
+                column.append(_to_float(values.get(key)))
+            for key in values.keys() - self._columns.keys():
+                column = array('d', [math.nan]) * count
+                column.append(_to_float(values[key]))
+                self._columns[key] = column
+        return True
+
+    # Copy of the sample times and of the column of every metric
+    def series(self):
+        with self._lock:
+            return array('d', self._times), {key: array('d', column) for key, column in self._columns.items()}
+
+    # Per metric summary: first, last, min and max value; counters also get the mean and peak rate per
+    # second and the longest stall (seconds without an increase while the counter did increase overall)
+    def summary(self):
+        times, columns = self.series()
+        result = {}
+        for key, column in columns.items():
+            points = [(t, v) for t, v in zip(times, column) if not math.isnan(v)]
+            if not points:
+                continue
+            values = [v for _, v in points]
+            entry = {"samples": len(points), "first": values[0], "last": values[-1], "min": min(values), "max": max(values)}
+            if len(points) > 1 and all(b >= a for a, b in zip(values, values[1:])):
+                rates = [(v1 - v0) / (t1 - t0) for (t0, v0), (t1, v1) in zip(points, points[1:]) if t1 > t0]
+                duration = points[-1][0] - points[0][0]
+                entry["mean_rate"] = (values[-1] - values[0]) / duration if duration > 0 else 0.0
+                entry["peak_rate"] = max(rates, default=0.0)
+                entry["longest_stall"] = _longest_stall(points) if values[-1] > values[0] else 0.0
+            result[key] = entry
+        return result
+
+    # Write the samples as CSV: one row per sample, one column per metric
+    def export_csv(self, path):
+        times, columns = self.series()
+        keys = sorted(columns)
+        with open(path, mode="w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp"] + keys)
+            for index, timestamp in enumerate(times):
+                writer.writerow([f"{timestamp:.3f}"] + ["" if math.isnan(columns[key][index]) else f"{columns[key][index]:g}" for key in keys])
+
+    # Write the summary and the samples as JSON
+    def export_json(self, path):
+        times, columns = self.series()
+        data = {
+            "interval": self.interval,
+            "errors": self.errors,
+            "timestamps": list(times),
+            "summary": self.summary(),
+            "series": {key: [None if math.isnan(v) else v for v in column] for key, column in sorted(columns.items())},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+# This function converts a metric value to float, NaN if missing or not numeric
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+# This function returns the longest time a counter did not increase, from (time, value) points
+def _longest_stall(points):
+    longest = 0.0
+    since = points[0][0]
+    for (t0, v0), (t1, v1) in zip(points, points[1:]):
+        if v1 > v0:
+            since = t1
+        longest = max(longest, t1 - since)
+    return longest
@@ -0,0 +1,238 @@
+import re
+import math
+from functools import lru_cache
+from collections import namedtuple
+
+_NAME = r'[a-zA-Z_:][a-zA-Z0-9_:]*'
+# A label block; a quoted value may contain '}' and escaped quotes
+# The pattern is unrolled so runs of plain characters are matched in one step
+_LABELS = r'\{[^"}\n]*(?:"[^"\\\n]*(?:\\.[^"\\\n]*)*"[^"}\n]*)*\}'
+# Sample lines only: name, labels, value; the timestamp and exemplar are skipped
+_RAW_RE = re.compile(rf'^[ \t]*({_NAME})({_LABELS})?[ \t]+([^ \t\n#]+)(?:[ \t]+-?[0-9.]+)?(?:[ \t]*#[^\n]*)?[ \t]*$', re.M)
+# HELP/TYPE lines (groups 1-3) or sample lines: name, labels, value, timestamp, exemplar labels, value, timestamp
+_LINE_RE = re.compile(
+    rf'^[ \t]*(?:#[ \t]+(HELP|TYPE)[ \t]+({_NAME})(?:[ \t]+([^\n]*?))?'
+    rf'|({_NAME})({_LABELS})?[ \t]+([^ \t\n#]+)(?:[ \t]+(-?[0-9.]+))?'
+    rf'(?:[ \t]*#[ \t]*({_LABELS})[ \t]+([^ \t\n]+)(?:[ \t]+([^ \t\n]+))?)?)[ \t]*$',
+    re.M
+)
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)[ \t]*=[ \t]*"((?:[^"\\]|\\.)*)"')
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+# Lines joined per regex scan when the exposition is given as an iterable of lines
+_CHUNK_LINES = 4096
+
+# Suffixes of the samples that belong to a histogram or summary family
+_FAMILY_SUFFIXES = ("_bucket", "_sum", "_count", "_created", "_total", "_info")
+
+# A parsed sample; labels is a sorted tuple of (name, value) pairs, exemplar is (labels, value, timestamp) or None
+Sample = namedtuple("Sample", ["name", "labels", "value", "timestamp", "exemplar"])
+# Buckets of one histogram series as sorted (upper bound, cumulative count) pairs
+Histogram = namedtuple("Histogram", ["buckets", "sum", "count"])
+# Quantiles of one summary series as {quantile: value}
+Summary = namedtuple("Summary", ["quantiles", "sum", "count"])
+
+
+def _unescape(value):
+    return _ESCAPE_RE.sub(lambda m: "\n" if m.group(1) == "n" else m.group(1), value)
+
+
+# This function decodes a raw label block like '{a="1",b="x\"y"}' into a sorted tuple of pairs
+# The same label blocks come back on every scrape, so the results are cached
+@lru_cache(maxsize=65536)
+def decode_labels(raw):
+    if not raw:
+        return ()
+    return tuple(sorted((name, _unescape(value) if "\\" in value else value) for name, value in _LABEL_RE.findall(raw)))
+
+
+# This function returns the metric key used by parse_metrics_to_dict: the name followed by the labels as written
+def metric_key(name, raw_labels):
+    return f"{name}{raw_labels or ''}"
+
+
+# This function yields the exposition as a few large strings, so each is scanned by one regex call
+# A string is used as is; an iterable of lines (e.g. a response being read) is joined in chunks of lines
+def _chunks(text):
+    if isinstance(text, str):
+        yield text
+        return
+    chunk = []
+    for line in text:
+        chunk.append(line.decode('utf-8') if isinstance(line, bytes) else line)
+        if len(chunk) >= _CHUNK_LINES:
+            yield "\n".join(part.rstrip("\n") for part in chunk)
+            chunk = []
+    if chunk:
+        yield "\n".join(part.rstrip("\n") for part in chunk)
+
+
+# This function yields (name, raw label block or '', value text) for every sample line
+# It is the fast path for callers keyed on the labels as written; comments and invalid lines are skipped
+def iter_raw_samples(text):
+    for chunk in _chunks(text):
+        yield from _RAW_RE.findall(chunk)
+
+
+# This function yields a Sample for every sample line, HELP and TYPE lines as ("HELP"|"TYPE", family, text)
+# `text` is the whole exposition or any iterable of lines, so a response can be parsed while it is read
+def iter_samples(text):
+    for chunk in _chunks(text):
+        for match in _LINE_RE.finditer(chunk):
+            meta, family, meta_text, name, raw_labels, value, timestamp, ex_labels, ex_value, ex_timestamp = match.groups()
+            if meta is not None:
+                yield meta, family, meta_text or ""
+                continue
+            try:
+                value = float(value)
+                exemplar = None
+                if ex_labels is not None:
+                    exemplar = (decode_labels(ex_labels), float(ex_value), float(ex_timestamp) if ex_timestamp else None)
+            except ValueError:
+                continue
+            yield Sample(name, decode_labels(raw_labels), value, float(timestamp) if timestamp else None, exemplar)
+
+
+# This class holds one parsed exposition
+# values maps (name, sorted label tuple) to float. Samples are grouped into families using the TYPE lines,
+# so the buckets of a histogram and the quantiles of a summary can be read together.
+class Exposition:
+    def __init__(self):
+        self.values = {}
+        self.types = {}
+        self.help = {}
+        self.families = {}
+        self.exemplars = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    # Value of a sample by name and labels, default if it is missing
+    def get(self, name, default=None, **labels):
+        return self.values.get((name, tuple(sorted(labels.items()))), default)
+
+    # Family a sample belongs to: its own name, or the name without a histogram/summary/counter suffix
+    def family_of(self, name):
+        if name in self.types:
+            return name
+        for suffix in _FAMILY_SUFFIXES:
+            if name.endswith(suffix) and name[:-len(suffix)] in self.types:
+                return name[:-len(suffix)]
+        return name
+
+    def add(self, sample):
+        key = (sample.name, sample.labels)
+        self.values[key] = sample.value
+        self.families.setdefault(self.family_of(sample.name), []).append(key)
+        if sample.exemplar is not None:
+            self.exemplars[key] = sample.exemplar
+
+    # Histograms of a family by the labels of each series (without 'le')
+    def histograms(self, family):
+        series = {}
+        for name, labels in self.families.get(family, ()):
+            value = self.values[(name, labels)]
+            if name == f"{family}_bucket":
+                bounds = dict(labels)
+                upper = float(bounds.pop("le", "+Inf"))
+                series.setdefault(tuple(sorted(bounds.items())), {"buckets": []})["buckets"].append((upper, value))
+            elif name in (f"{family}_sum", f"{family}_count"):
+                series.setdefault(labels, {"buckets": []})[name[len(family) + 1:]] = value
+        return {labels: Histogram(sorted(entry["buckets"]), entry.get("sum"), entry.get("count"))
+                for labels, entry in series.items()}
+
+    # Summaries of a family by the labels of each series (without 'quantile')
+    def summaries(self, family):
+        series = {}
+        for name, labels in self.families.get(family, ()):
+            value = self.values[(name, labels)]
+            if name == family:
+                bounds = dict(labels)
+                quantile = bounds.pop("quantile", None)
+                if quantile is not None:
+                    series.setdefault(tuple(sorted(bounds.items())), {"quantiles": {}})["quantiles"][float(quantile)] = value
+            elif name in (f"{family}_sum", f"{family}_count"):
+                series.setdefault(labels, {"quantiles": {}})[name[len(family) + 1:]] = value
+        return {labels: Summary(entry["quantiles"], entry.get("sum"), entry.get("count"))
+                for labels, entry in series.items()}
+
+
+# This function parses a Prometheus text exposition (a string or an iterable of lines) into an Exposition
+def parse_exposition(text):
+    exposition = Exposition()
+    for item in iter_samples(text):
+        if isinstance(item, Sample):
+            exposition.add(item)
+        elif item[0] == "TYPE":
+            exposition.types[item[1]] = item[2].strip()
+        else:
+            exposition.help[item[1]] = _unescape(item[2])
+    return exposition
+
+
+# This function adds up histograms with the same buckets, like sum by (le) in PromQL
+def merge_histograms(histograms):
+    counts = {}
+    total_sum = total_count = 0.0
+    for histogram in histograms:
+        for upper, count in histogram.buckets:
+            counts[upper] = counts.get(upper, 0.0) + count
+        total_sum += histogram.sum or 0.0
+        total_count += histogram.count or 0.0
+    return Histogram(sorted(counts.items()), total_sum, total_count)
+
+
+# This function returns the observations of the interval between two snapshots of a histogram
+# A counter reset (the service restarted in between) makes the later snapshot the whole interval
+def histogram_delta(before, after):
+    if before is None:
+        return after
+    previous = dict(before.buckets)
+    buckets = [(upper, count - previous.get(upper, 0.0)) for upper, count in after.buckets]
+    if any(count < 0 for _, count in buckets) or (after.count or 0.0) < (before.count or 0.0):
+        return after
+    return Histogram(buckets, (after.sum or 0.0) - (before.sum or 0.0), (after.count or 0.0) - (before.count or 0.0))
+
+
+# This function estimates a quantile (0..1) from cumulative histogram buckets, like histogram_quantile in PromQL
+# The value is interpolated linearly inside the bucket holding the rank. A rank in the +Inf bucket returns the
+# highest finite bound. NaN when the histogram has no observations or no +Inf bucket.
+def histogram_quantile(quantile, histogram):
+    buckets = histogram.buckets
+    if not buckets or not math.isinf(buckets[-1][0]) or buckets[-1][1] <= 0:
+        return math.nan
+    rank = quantile * buckets[-1][1]
+    lower, lower_count = 0.0, 0.0
+    for index, (upper, count) in enumerate(buckets):
+        # Scrapes are not atomic, so a bucket may be behind the one below it
+        count = max(count, lower_count)
+        if count >= rank:
+            if math.isinf(upper):
+                return buckets[index - 1][0] if index > 0 else math.nan
+            if index == 0 and upper <= 0:
+                return upper
+            if count == lower_count:
+                return upper
+            return lower + (upper - lower) * (rank - lower_count) / (count - lower_count)
+        lower, lower_count = upper, count
+    return math.nan
+
+
+# This function computes quantiles of a histogram family for the interval between two Expositions
+# Returns {labels: {quantile: value}} per series, or a single {quantile: value} of all series matching
+# `labels` added up when merge=True. `before` None uses everything observed up to `after`.
+def interval_quantiles(before, after, family, quantiles=(0.5, 0.95, 0.99), labels=None, merge=False):
+    wanted = set((labels or {}).items())
+    previous = before.histograms(family) if before is not None else {}
+    series = {key: histogram_delta(previous.get(key), histogram)
+              for key, histogram in after.histograms(family).items() if wanted <= set(key)}
+    if merge:
+        histogram = merge_histograms(series.values())
+        return {q: histogram_quantile(q, histogram) for q in quantiles}
+    return {key: {q: histogram_quantile(q, histogram) for q in quantiles} for key, histogram in series.items()}
@@ -0,0 +1,72 @@
+import shlex
+import secrets
+from collections import namedtuple
+
+# Result of one command of a batch
+RemoteResult = namedtuple("RemoteResult", ["stdout", "stderr", "exit_status"])
+
+
+# This function feeds the password to a command starting with 'sudo ' like run_remote_command does
+def sudo_command(command, password=None):
+    if command.strip().startswith('sudo ') and password is not None:
+        return f"echo {shlex.quote(password)} | sudo -S -p '' {command.strip()[5:]}"
+    return command
+
+
+# This function builds one shell script running the commands in order, each in a subshell and framed by
+# delimiter lines
+# The delimiters carry a random nonce, so command output cannot be mistaken for a frame. stderr of each
+# command goes to a temporary file and is printed in its own frame after stdout, followed by the exit code.
+# Commands starting with 'sudo ' get the password on stdin, see sudo_command().
+def build_batch_script(commands, password=None):
+    nonce = secrets.token_hex(8)
+    lines = ['_batch_err=$(mktemp)']
+    for index, command in enumerate(commands):
+        command = sudo_command(command, password)
+        lines.append(f"printf '%s\\n' '{nonce}:{index}:stdout'")
+        lines.append(f"( {command} ) < /dev/null 2>\"$_batch_err\"; _batch_rc=$?")
+        lines.append(f"printf '\\n%s\\n' '{nonce}:{index}:stderr'; cat \"$_batch_err\"")
+        lines.append(f"printf '\\n%s\\n' \"{nonce}:{index}:exit:$_batch_rc\"")
+    lines.append('rm -f "$_batch_err"')
+    return nonce, "\n".join(lines)
+
+
+# This function splits the output of a batch script into one RemoteResult per command
+# Commands that produced no frame (the batch was cut short) get exit status None
+def parse_batch_output(nonce, output, count):
+    stdout = [""] * count
+    stderr = [""] * count
+    status = [None] * count
+    current = None
+    parts = []
+    prefix = f"{nonce}:"
+
+    def close_frame():
+        if current is not None:
+            text = "".join(parts)
+            index, stream = current
+            if stream == "stdout":
+                stdout[index] = text
+            else:
+                stderr[index] = text
+
+    for line in output.splitlines(keepends=True):
+        if line.startswith(prefix):
+            fields = line.strip().split(":")
+            if len(fields) >= 3 and fields[1].isdigit() and int(fields[1]) < count:
+                # The stderr and exit delimiters are preceded by an extra newline from printf
+                if parts and parts[-1].endswith("\n"):
+                    parts[-1] = parts[-1][:-1]
+                close_frame()
+                index = int(fields[1])
+                if fields[2] == "exit":
+                    status[index] = int(fields[3]) if len(fields) > 3 and fields[3].lstrip("-").isdigit() else None
+                    current = None
+                else:
+                    current = (index, fields[2])
+                parts = []
+                continue
+        if current is not None:
+            parts.append(line)
+    close_frame()
+    return [RemoteResult(stdout[i], stderr[i], status[i]) for i in range(count)]
@@ -0,0 +1,91 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .html_report_generator import reserve_testcases
+
+logger = logging.getLogger("AutomationLogger")
+
+# Resources a test case can declare. Two test cases conflict when one holds a
+# resource exclusively that the other holds in any mode.
+NE_HOST = "NE_HOST"                    # NE simulator host (one simulator instance at a time)
+NEM_HOST = "NEM_HOST"                  # NEM simulator host (one simulator instance at a time)
+ALG_FILTER_RULES = "ALG_FILTER_RULES"  # ALG filter-rule chain (exclusive to change it, shared to rely on it)
+ALG_SERVICE = "ALG_SERVICE"            # ALG service (exclusive to restart/reconfigure it, shared by every test)
+ALG_LOGS = "ALG_LOGS"                  # ALG journal and metrics (exclusive to assert on them, shared by every test)
+
+
+# This class describes a test case together with the resources it holds while running
+class ScheduledTest:
+    def __init__(self, test_id, description, method, exclusive=(), shared=()):
+        self.test_id = test_id
+        self.description = description
+        self.method = method
+        self.exclusive = set(exclusive)
+        # Every test case talks to the ALG, so it holds the ALG service and adds to its logs and metrics
+        # at least in shared mode. The ALG log of a test is cut by time, so a test asserting on the ALG logs
+        # or metrics holds ALG_LOGS exclusively to keep other tests' traffic out of them.
+        self.shared = (set(shared) | {ALG_SERVICE, ALG_LOGS}) - self.exclusive
+
+    # Check whether two test cases can not run at the same time
+    def conflicts_with(self, other):
+        return bool(self.exclusive & (other.exclusive | other.shared) or other.exclusive & self.shared)
+
+
+# This class runs test cases through a TestRunner, running non-conflicting test cases in parallel
+# Conflicting test cases always run in declared order, and results are recorded in declared order
+# so the CSV and HTML reports are the same as for a sequential run
+class TestScheduler:
+    def __init__(self, runner, max_workers=4):
+        self.runner = runner
+        self.max_workers = max(1, int(max_workers))
+        self.tests = []
+
+    # Add a test case with the resources it needs
+    def add(self, test_id, description, method, exclusive=(), shared=()):
+        self.tests.append(ScheduledTest(test_id, description, method, exclusive, shared))
+
+    # Check whether a pending test case can be started now
+    def _is_runnable(self, test, running, pending):
+        if any(test.conflicts_with(other) for other in running):
+            return False
+        # Do not overtake an earlier declared test case that conflicts with this one
+        for other in pending:
+            if other is test:
+                return True
+            if test.conflicts_with(other):
+                return False
+        return True
+
+    # Run all test cases and record their results in declared order
+    def run(self):
+        reserve_testcases([test.test_id for test in self.tests])
+        pending = list(self.tests)
+        running = {}
+        results = {}
+        next_to_record = 0
+
+        logger.info(f"Scheduling {len(pending)} test cases with up to {self.max_workers} in parallel")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="TestWorker") as executor:
+            while pending or running:
+                for test in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    if self._is_runnable(test, running.values(), pending):
+                        pending.remove(test)
+                        logger.debug(f"Starting [{test.test_id}] alongside {[t.test_id for t in running.values()]}")
+                        future = executor.submit(self.runner.run_test, test.test_id, test.description, test.method, False)
+                        running[future] = test
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    test = running.pop(future)
+                    try:
+                        results[test.test_id] = future.result()
+                    except Exception as e:
+                        logger.exception(f"[Exception]: Scheduler failed to run [{test.test_id}]: {e}")
+                        results[test.test_id] = (test.test_id, "FAIL", 0.0)
+
+                # Record the finished prefix of the declared order
+                while next_to_record < len(self.tests) and self.tests[next_to_record].test_id in results:
+                    self.runner._log_test_result(*results[self.tests[next_to_record].test_id])
+                    next_to_record += 1
+        return [results[test.test_id] for test in self.tests]
@@ -0,0 +1,81 @@
+import time
+import shlex
+import logging
+import threading
+
+logger = logging.getLogger("AutomationLogger")
+
+# Directory under the simulator START_PATH holding the binaries, one sub directory per source hash
+CACHE_DIR = ".alg-sim-cache"
+
+# Remote script: hash the Go sources (with the toolchain version and build flags), build once per hash, print the binary path
+# The binary is built under a temporary name and renamed, so a failed build never leaves a broken binary
+_RESOLVE_SCRIPT = (
+    "cd {path} && "
+    "h=$({{ go version; echo {targets}; find . -type f \\( -name '*.go' -o -name go.mod -o -name go.sum \\) "
+    "-not -path './{cache}/*' -print0 | sort -z | xargs -0 sha256sum; }} | sha256sum | cut -c1-16) && "
+    "b={cache}/$h/simulator && "
+    "if [ ! -x \"$b\" ]; then mkdir -p {cache}/$h && go build -o \"$b.tmp\" {targets} && mv \"$b.tmp\" \"$b\" && echo built; fi && "
+    "echo \"binary=$b\""
+)
+
+
+# This function splits a 'go run' command into the 'go build' arguments (flags and package or files)
+# and the program arguments. Returns None if the command is not a 'go run' command
+def parse_go_run(command):
+    tokens = shlex.split(command)
+    if tokens[:2] != ["go", "run"]:
+        return None
+    index = 2
+    while index < len(tokens) and tokens[index].startswith("-"):
+        index += 1
+    first_target = index
+    while index < len(tokens) and tokens[index].endswith(".go"):
+        index += 1
+    if index == first_target and index < len(tokens):
+        # A package path instead of .go files
+        index += 1
+    build_args = tokens[2:index]
+    return build_args if index > first_target else build_args + ["."], tokens[index:]
+
+
+# This class replaces 'go run' simulator commands by a prebuilt binary
+# The binary is content addressed by the hash of the Go sources on the simulator host, so it is rebuilt only
+# when the sources (or the Go toolchain) change, and reused by every start in between.
+class SimulatorBuildCache:
+    def __init__(self, ssh_pool):
+        self.ssh_pool = ssh_pool
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    # Return (command to run, build seconds or None if the cached binary was reused)
+    # Commands other than 'go run' are returned unchanged
+    def resolve(self, ip_address, username, password, path, command):
+        parsed = parse_go_run(command)
+        if parsed is None:
+            return command, None
+        build_args, args = parsed
+        with self._lock:
+            key_lock = self._locks.setdefault((ip_address, path), threading.Lock())
+
+        script = _RESOLVE_SCRIPT.format(path=shlex.quote(path), cache=CACHE_DIR, targets=" ".join(shlex.quote(a) for a in build_args))
+        # Builds on the same host and path are serialized so a source hash is only built once
+        with key_lock, self.ssh_pool.connection(ip_address, username, password) as client:
+            start = time.monotonic()
+            channel = client.get_transport().open_session()
+            try:
+                channel.exec_command(script)
+                output = channel.makefile('r').read().decode('utf-8', errors='replace')
+                error = channel.makefile_stderr('r').read().decode('utf-8', errors='replace')
+                status = channel.recv_exit_status()
+            finally:
+                channel.close()
+            elapsed = time.monotonic() - start
+
+        lines = output.strip().splitlines()
+        if status != 0 or not lines or not lines[-1].startswith("binary="):
+            raise RuntimeError(f"Simulator build failed in {path} on {ip_address}: {error.strip() or output.strip()}")
+        binary = lines[-1][len("binary="):]
+        built = "built" in lines
+        logger.info(f"{'Built' if built else 'Reusing'} simulator binary {binary} on {ip_address}" + (f" in {elapsed:.2f} seconds" if built else ""))
+        return " ".join([shlex.quote(f"./{binary}")] + [shlex.quote(a) for a in args]), (elapsed if built else None)
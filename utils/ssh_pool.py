@@ -0,0 +1,145 @@
+import time
+import logging
+import threading
+import paramiko
+from contextlib import contextmanager
+
+logger = logging.getLogger("AutomationLogger")
+
+
+# This class holds one pooled SSH connection and the number of callers currently using it
+class _PooledConnection:
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.users = 0
+        self.last_used = time.monotonic()
+        self.last_checked = time.monotonic()
+
+
+# This class keeps authenticated SSH connections per (ip, username, port) and shares them between callers
+# Every caller opens its own channel on the shared transport (exec, PTY, SFTP), so concurrent users are
+# multiplexed over a single key exchange and password authentication.
+# A connection serves at most max_sessions callers at a time, which keeps the channels below sshd's
+# MaxSessions (10 by default); more callers get another connection to the same host.
+# Broken connections are detected with a health check and re-established; a broken connection still in use
+# is retired and closed when its last caller releases it. Connections that are not used for idle_timeout
+# seconds are closed.
+class SSHConnectionPool:
+    def __init__(self, idle_timeout=300, health_check_interval=30, max_sessions=8):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.max_sessions = max_sessions
+        self._connections = {}  # {key: [_PooledConnection]}
+        self._retired = {}  # {client: _PooledConnection} replaced while in use
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    # Open a new SSH connection
+    def _connect(self, ip_address, username, password, port):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(hostname=ip_address, port=port, username=username, password=password, allow_agent=False, look_for_keys=False)
+        transport = client.get_transport()
+        transport.set_keepalive(30)
+        return client
+
+    # Check that the pooled connection can still be used
+    def _is_healthy(self, connection):
+        transport = connection.client.get_transport()
+        if transport is None or not transport.is_active() or not transport.is_authenticated():
+            return False
+        if time.monotonic() - connection.last_checked > self.health_check_interval:
+            try:
+                transport.send_ignore()
+            except Exception:
+                return False
+            connection.last_checked = time.monotonic()
+        return True
+
+    # Close connections nobody has used for idle_timeout seconds
+    def _evict_idle(self):
+        now = time.monotonic()
+        idle = []
+        with self._lock:
+            for connections in self._connections.values():
+                idle += [c for c in connections if c.users == 0 and now - c.last_used > self.idle_timeout]
+                connections[:] = [c for c in connections if c.users > 0 or now - c.last_used <= self.idle_timeout]
+        for connection in idle:
+            logger.debug(f"Closing idle SSH connection - {connection.key[0]} - with username - {connection.key[1]}")
+            connection.client.close()
+
+    # Take a broken connection out of the pool; it is closed now if unused, else on its last release()
+    def _retire(self, connection):
+        with self._lock:
+            connections = self._connections.get(connection.key, [])
+            if connection in connections:
+                connections.remove(connection)
+            if connection.users > 0:
+                self._retired[connection.client] = connection
+                return
+        connection.client.close()
+
+    # Get a connected SSHClient for the host; it must be handed back with release()
+    def acquire(self, ip_address, username, password, port=22):
+        self._evict_idle()
+        key = (ip_address, username, port)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Connecting is serialized per host only, so slow hosts do not block the others
+        with key_lock:
+            while True:
+                with self._lock:
+                    available = [c for c in self._connections.get(key, ()) if c.users < self.max_sessions]
+                connection = available[0] if available else None
+                if connection is None or self._is_healthy(connection):
+                    break
+                logger.warning(f"Pooled SSH connection to {ip_address} is broken, reconnecting")
+                self._retire(connection)
+            if connection is None:
+                connection = _PooledConnection(key, self._connect(ip_address, username, password, port))
+                logger.debug(f"SSH connection successful - {ip_address} - with username - {username}")
+                with self._lock:
+                    self._connections.setdefault(key, []).append(connection)
+            with self._lock:
+                connection.users += 1
+                connection.last_used = time.monotonic()
+        return connection.client
+
+    # Hand a client obtained from acquire() back to the pool
+    def release(self, client):
+        with self._lock:
+            retired = self._retired.get(client)
+            if retired is not None:
+                retired.users -= 1
+                if retired.users > 0:
+                    return
+                del self._retired[client]
+            else:
+                for connections in self._connections.values():
+                    for connection in connections:
+                        if connection.client is client:
+                            connection.users = max(0, connection.users - 1)
+                            connection.last_used = time.monotonic()
+                            return
+        # A retired connection whose last caller is done, or a client the pool does not know
+        client.close()
+
+    # Context manager around acquire()/release()
+    @contextmanager
+    def connection(self, ip_address, username, password, port=22):
+        client = self.acquire(ip_address, username, password, port)
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    # Close all pooled connections
+    def close_all(self):
+        with self._lock:
+            connections = [c for pooled in self._connections.values() for c in pooled] + list(self._retired.values())
+            self._connections.clear()
+            self._retired.clear()
+        for connection in connections:
+            connection.client.close()
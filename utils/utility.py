@@ -1,15 +1,18 @@
 import os
 import time
 import csv
+import atexit
+import asyncio
+import base64
+import hashlib
+import shlex
 import json
-import ssl
 import ast
 import re
 import textwrap
 import logging
-import paramiko
-import tempfile
-import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from ruamel.yaml import YAML
 from ruamel.yaml.scalarstring import DoubleQuotedScalarString
@@ -17,14 +20,28 @@ from ruamel.yaml.comments import CommentedMap, CommentedSeq
 from tabulate import tabulate
 import configparser
 from .html_report_generator import create_html_handler
-from .Server import Server
-from .html_report_generator import start_testcase, end_testcase
+from .Server import Server, RemoteFileServer
+from .ssh_pool import SSHConnectionPool
+from .https_client import HTTPSClientPool
+from .journal_tail import JournalTail
+from .sim_build import SimulatorBuildCache
+from .config_stage import ConfigStager
+from .journal_fetch import JournalMark, journal_position, query_cursor, fetch_journal, cursor_command, parse_cursor, journal_command, decode_journal
+from .remote_batch import RemoteResult, build_batch_script, parse_batch_output
+from .async_remote import AsyncRemote
+from .metrics_sampler import MetricsSampler
+from .metrics_delta import MetricExpectation, MetricsSnapshots, check_latency_slos
+from .prometheus import parse_exposition, iter_raw_samples, decode_labels, metric_key, interval_quantiles
+from .catalog import get_api_catalog, get_expected_values
+from .alg_log import ALGLog, ALGLogQuery
+from .log_verifier import LogAssertion, verify_log, MMAP_THRESHOLD, compile_pattern, count_matching_lines
+from .wait_engine import OutputCondition, stats_row, stats_pattern, wait_for_simulators, wait_for_metric_deltas
+from .html_report_generator import start_testcase, end_testcase, get_current_testcase, set_current_testcase
 
 config = configparser.ConfigParser()
 config_dir = os.path.join(os.path.dirname(__file__), "..", "Config")
 config_path = os.path.join(config_dir, 'config.ini')
 config.read(os.path.abspath(config_path))
-api_json_path = os.path.join(config_dir, config['AUTOMATION_VARS']['API_FILE'])
 expected_values_path = os.path.join(config_dir, config['AUTOMATION_VARS']['EXPECTED_API_FILE'])
 
 # This function creates a directory for reports
@@ -121,87 +138,277 @@ def get_logger(report_dir, timestamp=None):
     return logger, log_file
 
 
+# Pool of SSH connections shared by all remote helpers, keyed on (ip, username, port)
+_ssh_pool = SSHConnectionPool(
+    idle_timeout=config.getint('AUTOMATION_VARS', 'SSH_IDLE_TIMEOUT', fallback=300),
+    health_check_interval=config.getint('AUTOMATION_VARS', 'SSH_HEALTH_CHECK_INTERVAL', fallback=30),
+    max_sessions=config.getint('AUTOMATION_VARS', 'SSH_MAX_SESSIONS', fallback=8)
+)
+atexit.register(_ssh_pool.close_all)
+
+
 # This function establishes an SSH connection to a remote server
+# The connection comes from the pool and must be handed back with ssh_release()
 def ssh_connect(ip_address, username, password, port=22):
     try:
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(hostname=ip_address, port=port, username=username, password=password, allow_agent=False, look_for_keys=False)
-        logger.debug(f"SSH connection successful - {ip_address} - with username - {username}")
-        return client
+        return _ssh_pool.acquire(ip_address, username, password, port)
     except Exception as e:
         logger.error(f"SSH connection failed: {e}", exc_info=True)
         return None
-    
 
-# This function starts the NE server in a background thread using SSH    
-def start_NE(testcase_id, report_dir, config_file, log_file=None):
-    if log_file is None:
-        log_file = os.path.join(report_dir, testcase_id, "NE_server.log")
+
+# This function hands an SSH connection obtained from ssh_connect() back to the pool
+def ssh_release(client):
+    if client is not None:
+        _ssh_pool.release(client)
     
-    ne_server = Server(
-        server_name="NE",
-        ip_address=config['NE']['IP_ADDRESS'],
-        username=config['NE']['USERNAME'],
-        password=config['NE']['PASSWORD'],
-        path=config['NE']['START_PATH'],
-        command=config['NE']['START_COMMAND'],
+
+# asyncio layer over the SSH pool, for driving several hosts at the same time from one thread
+_async_remote = AsyncRemote(_ssh_pool)
+atexit.register(_async_remote.close)
+
+
+# Cache of prebuilt simulator binaries, used instead of 'go run' when SIM_BUILD_CACHE is enabled
+_sim_build_cache = SimulatorBuildCache(_ssh_pool)
+
+
+# This function returns the command that starts a simulator, replacing 'go run' by the cached binary
+# The build time is recorded in Timings.csv when the binary had to be (re)built
+def resolve_simulator_command(server_name, ip_address, username, password, path, command):
+    if not config.getboolean('AUTOMATION_VARS', 'SIM_BUILD_CACHE', fallback=False):
+        return command
+    try:
+        resolved, build_time = _sim_build_cache.resolve(ip_address, username, password, path, command)
+    except Exception as e:
+        logger.warning(f"[{server_name}] Simulator build cache unavailable, using '{command}': {e}")
+        return command
+    if build_time is not None:
+        record_timing(get_current_testcase(), f"{server_name}_simulator_build", build_time)
+    return resolved
+
+
+# Simulator configs staged on the simulator hosts by content hash
+_config_stager = ConfigStager(_ssh_pool)
+
+
+# This function uploads a batch of configs to each simulator host in one SFTP session, skipping staged ones
+# Tests then select a staged config by hash when they start a simulator (see Server.apply_config)
+def stage_simulator_configs(ne_configs=(), nem_configs=()):
+    for server_name, local_paths in (("NE", ne_configs), ("NEM", nem_configs)):
+        if not local_paths:
+            continue
+        section = config[server_name]
+        try:
+            _config_stager.stage(section['IP_ADDRESS'], section['USERNAME'], section['PASSWORD'], section['START_PATH'],
+                                 local_paths, [f"{section['START_PATH']}/config.yaml"])
+        except Exception as e:
+            logger.warning(f"Failed to stage {server_name} simulator configs, they will be uploaded on start: {e}")
+
+
+# Simulators kept running in fixture mode, by server name
+_fixtures = {}
+_fixtures_lock = threading.Lock()
+
+
+# This function returns the hash identifying a simulator start: config file contents, path and command
+def _simulator_config_hash(section, config_file):
+    digest = hashlib.sha256(f"{section['START_PATH']}\0{section['START_COMMAND']}\0".encode())
+    if config_file:
+        with open(config_file, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+# This function creates a simulator and uploads its config, ready to be started
+# With fixture mode enabled for the simulator (SIM_FIXTURES in config.ini, or fixture=True) a running instance
+# started with an identical config is reused: its log file is switched to the new test case and its stats so far
+# become the offset of stats conditions (see Server.attach). Not available with remote logging.
+# Simulators listed in SIM_REMOTE_LOGGING write their output to a file on their host (see RemoteFileServer).
+# Returns (server, command to start it with), the command is None when a running instance is reused
+def _prepare_simulator(server_name, testcase_id, report_dir, config_file, log_file, fixture=None):
+    section = config[server_name]
+    if fixture is None:
+        fixture = server_name in [name.strip() for name in config.get('AUTOMATION_VARS', 'SIM_FIXTURES', fallback="").split(",")]
+    remote_logging = server_name in [name.strip() for name in config.get('AUTOMATION_VARS', 'SIM_REMOTE_LOGGING', fallback="").split(",")]
+    if fixture and remote_logging:
+        # The remote log file is fetched once at stop, so it cannot be split per test case
+        logger.warning(f"Fixture mode is not supported for {server_name} with remote logging, starting a new simulator")
+        fixture = False
+    config_hash = _simulator_config_hash(section, config_file)
+
+    with _fixtures_lock:
+        running = _fixtures.pop(server_name, None)
+    if running is not None:
+        if fixture and running.is_running() and running.config_hash == config_hash:
+            running.attach(testcase_id, log_file)
+            with _fixtures_lock:
+                _fixtures[server_name] = running
+            return running, None
+        logger.info(f"Config of {server_name} simulator changed, restarting it")
+        running.stop_server(force=True)
+
+    server_class = RemoteFileServer if remote_logging else Server
+    server = server_class(
+        server_name=server_name,
+        ip_address=section['IP_ADDRESS'],
+        username=section['USERNAME'],
+        password=section['PASSWORD'],
+        path=section['START_PATH'],
+        command=section['START_COMMAND'],
         log_file=log_file,
         logger=logger
     )
-    ne_server.apply_config(local_config_path=config_file, remote_config_path=f"{config['NE']['START_PATH']}/config.yaml")
-    logger.info(f"Starting NE simulator")
-    ne_server.start_server()
-    logger.info(f"NE simulator started successfully")
-    return ne_server
+    server.config_hash = config_hash
+    server.keep_alive = fixture
+    server.idle_log_file = os.path.join(report_dir, f"{server_name}_fixture.log")
+    server.apply_config(local_config_path=config_file, remote_config_path=f"{section['START_PATH']}/config.yaml")
+    command = resolve_simulator_command(server_name, server.ip, server.username, server.password, server.path, server.command)
+    return server, command
+
+
+# This function starts a prepared simulator; a reused fixture (command None) is already running
+def _launch_simulator(server, command):
+    if command is None:
+        return
+    logger.info(f"Starting {server.name} simulator")
+    server.start_server(command)
+    if server.keep_alive:
+        with _fixtures_lock:
+            _fixtures[server.name] = server
+    logger.info(f"{server.name} simulator started successfully")
+
+
+# This function starts a simulator in a background thread using SSH
+def _start_simulator(server_name, testcase_id, report_dir, config_file, log_file, fixture=None):
+    server, command = _prepare_simulator(server_name, testcase_id, report_dir, config_file, log_file, fixture)
+    _launch_simulator(server, command)
+    return server
+
+
+# This function runs a function in a worker thread on behalf of a test case, so its logs reach the test case steps
+def _in_testcase(testcase_id, function, *args):
+    set_current_testcase(testcase_id)
+    return function(*args)
+
+
+# This function returns the TCP ports the NE listens on with the given simulator config (whitelisted_ips[*].ports)
+def _simulator_listen_ports(config_file):
+    with open(config_file, 'r') as f:
+        data = YAML(typ='safe').load(f) or {}
+    return sorted({int(port) for entry in data.get('whitelisted_ips') or [] for port in entry.get('ports') or []})
+
+
+# This function returns True once every port is in the LISTEN state on the simulator host
+def _simulator_listening(server_name, ports):
+    section = config[server_name]
+    output = run_remote_command(section['IP_ADDRESS'], section['USERNAME'], section['PASSWORD'], "ss -Hltn")
+    listening = set()
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) >= 4 and fields[3].rpartition(':')[2].isdigit():
+            listening.add(int(fields[3].rpartition(':')[2]))
+    return set(ports) <= listening
+
+
+# This function brings up NE and NEM together and returns (ne_server, nem_server)
+# Both configs are uploaded in parallel and the NE is started. The NEM is only launched once every port of the NE
+# config is listening on the NE host; if READY_PATTERN of the [NE] section is set (a regex on the NE's startup line),
+# the NE output must match it as well. Every phase is recorded in Timings.csv.
+def start_simulators(testcase_id, report_dir, ne_config_file, nem_config_file, ne_log_file=None, nem_log_file=None, ready_timeout=30):
+    if ne_log_file is None:
+        ne_log_file = os.path.join(report_dir, testcase_id, "NE_server.log")
+    if nem_log_file is None:
+        nem_log_file = os.path.join(report_dir, testcase_id, "NEM_server.log")
+    bringup_start = time.monotonic()
+
+    # Both hosts are prepared at the same time on the shared AsyncRemote executor
+    current_testcase = get_current_testcase()
+    async def prepare():
+        return await asyncio.gather(
+            _async_remote.call(_in_testcase, current_testcase, _prepare_simulator, "NE", testcase_id, report_dir, ne_config_file, ne_log_file),
+            _async_remote.call(_in_testcase, current_testcase, _prepare_simulator, "NEM", testcase_id, report_dir, nem_config_file, nem_log_file)
+        )
+    (ne_server, ne_command), (nem_server, nem_command) = asyncio.run(prepare())
+    setup_time = time.monotonic() - bringup_start
+    record_timing(testcase_id, "simulators_setup", setup_time)
+
+    ready_start = time.monotonic()
+    _launch_simulator(ne_server, ne_command)
+    if ne_command is not None:
+        deadline = ready_start + ready_timeout
+        ports = _simulator_listen_ports(ne_config_file)
+        ready_pattern = config.get('NE', 'READY_PATTERN', fallback=None)
+        ready = ne_server.is_running() and _poll_until(lambda: _simulator_listening("NE", ports), deadline) is not None
+        if ready and ready_pattern:
+            ready = ne_server.wait_until([OutputCondition(ready_pattern, use_regex=True)], max(deadline - time.monotonic(), 0))
+        if not ready:
+            ne_server.stop_server(force=True)
+            raise AssertionError(f"NE simulator not listening on ports {ports} within {ready_timeout} seconds")
+    ready_time = time.monotonic() - ready_start
+    record_timing(testcase_id, "NE_ready", ready_time)
+
+    nem_start = time.monotonic()
+    _launch_simulator(nem_server, nem_command)
+    nem_time = time.monotonic() - nem_start
+    record_timing(testcase_id, "NEM_start", nem_time)
+
+    total = time.monotonic() - bringup_start
+    record_timing(testcase_id, "simulators_bringup", total)
+    logger.info(f"Simulators up in {total:.2f} seconds (setup {setup_time:.2f}s, NE ready {ready_time:.2f}s, NEM start {nem_time:.2f}s)")
+    return ne_server, nem_server
+
+
+# This function stops the simulators kept running in fixture mode
+def stop_simulator_fixtures():
+    with _fixtures_lock:
+        servers = list(_fixtures.values())
+        _fixtures.clear()
+    for server in servers:
+        server.stop_server(force=True)
+atexit.register(stop_simulator_fixtures)
+
+
+# This function starts the NE server in a background thread using SSH    
+def start_NE(testcase_id, report_dir, config_file, log_file=None, fixture=None):
+    if log_file is None:
+        log_file = os.path.join(report_dir, testcase_id, "NE_server.log")
+    return _start_simulator("NE", testcase_id, report_dir, config_file, log_file, fixture)
 
 
 # This function starts the NEM server in a background thread using SSH
-def start_NEM(testcase_id, report_dir, config_file, log_file=None):
+def start_NEM(testcase_id, report_dir, config_file, log_file=None, fixture=None):
     if log_file is None:
         log_file = os.path.join(report_dir, testcase_id, "NEM_server.log")
-    
-    nem_server = Server(
-        server_name="NEM",
-        ip_address=config['NEM']['IP_ADDRESS'],
-        username=config['NEM']['USERNAME'],
-        password=config['NEM']['PASSWORD'],
-        path=config['NEM']['START_PATH'],
-        command=config['NEM']['START_COMMAND'],
-        log_file=log_file,
-        logger=logger
-    )
-    nem_server.apply_config(local_config_path=config_file, remote_config_path=f"{config['NEM']['START_PATH']}/config.yaml")
-    logger.info(f"Starting NEM simulator")
-    nem_server.start_server()
-    logger.info(f"NEM simulator started successfully")
-    return nem_server
+    return _start_simulator("NEM", testcase_id, report_dir, config_file, log_file, fixture)
+
+
+# Pool of kept-alive HTTPS connections to the ALG REST server, with one cached SSLContext per client certificate
+_https_pool = HTTPSClientPool()
+atexit.register(_https_pool.close_all)
 
 
 # This function runs an API call using HTTPS with client certificate authentication
+# Connections are kept alive and TLS sessions resumed; see get_last_api_timing() for the request timing
 def run_api(host, port, api_path, headers, client_crt, client_key, client_ca, data, method='POST'):
-    conn = None
     try:
-        context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=client_ca)
-        context.load_cert_chain(certfile=client_crt, keyfile=client_key)
-
-        conn = http.client.HTTPSConnection(host, port, context=context)
-        body = json.dumps(data) if data else None
-        conn.request(method.upper(), api_path, body=body, headers=headers)
-
-        response = conn.getresponse()
-        logger.info(f"Received response - [{response.status}] - from the ALG Server")
-        response_data = response.read().decode()
-        return response.status, response_data
+        # Bodies from the API catalog are already serialized
+        body = data if isinstance(data, bytes) else (json.dumps(data) if data else None)
+        status, response_data, timing = _https_pool.request(host, port, method, api_path, body, headers,
+                                                            client_crt, client_key, client_ca)
+        logger.info(f"Received response - [{status}] - from the ALG Server")
+        logger.debug(f"Request timing - connect: {timing.connect * 1000:.1f} ms, TLS handshake: {timing.tls_handshake * 1000:.1f} ms, "
+                     f"TTFB: {timing.ttfb * 1000:.1f} ms, total: {timing.total * 1000:.1f} ms, "
+                     f"reused connection: {timing.reused}, resumed TLS session: {timing.session_reused}")
+        return status, response_data
     except Exception as e:
         logger.error("Request failed: %s", e)
         return None
-    finally:
-        if conn:
-            try:
-                conn.close()
-            except Exception:
-                pass
+
+
+# This function returns the timing (connect, TLS handshake, time to first byte, total) of the last
+# API call made by the calling thread
+def get_last_api_timing():
+    return _https_pool.last_timing()
 
 
 # This function triggers an API call based on the provided API key and JSON configuration file
@@ -209,20 +416,17 @@ def trigger_api(api_key, api_file=config['AUTOMATION_VARS']['API_FILE'], host=co
     
     api_json_path = os.path.join(config_dir, api_file)
     try:
-        with open(api_json_path, "r") as f:
-            api_config = json.load(f)
+        # The catalog is parsed once and holds each request body pre-serialized
+        api_catalog = get_api_catalog(api_json_path)
 
-        if api_key not in api_config:
+        if api_key not in api_catalog:
             raise KeyError(f"API key '{api_key}' not found in {api_file}")
 
-        api_details = api_config[api_key]
-        method = api_details.get("method", "POST")
-        api_path = api_details.get("api_path", "")
-        data = api_details.get("data", None)
-        headers = api_details.get("headers", {"Content-Type": "application/json"})
-        logger.info(f"Running Rest API - {api_path} - {method} from REST Client to ALG Server")
-        result = run_api(host, port, api_path, headers,
-                         config['TLS_CERTS']['CERT'], config['TLS_CERTS']['KEY'], config['TLS_CERTS']['CA'], data, method)
+        api_request = api_catalog[api_key]
+        logger.info(f"Running Rest API - {api_request.api_path} - {api_request.method} from REST Client to ALG Server")
+        result = run_api(host, port, api_request.api_path, api_request.headers,
+                         config['TLS_CERTS']['CERT'], config['TLS_CERTS']['KEY'], config['TLS_CERTS']['CA'],
+                         api_request.body, api_request.method)
         if not result:
             logger.error("No response returned from ALG server")
             return None, None
@@ -267,32 +471,16 @@ def validate_result(expected, result, parent_key=""):
 
 
 # This function parses the response string into a dictionary of metrics
+# Keys are the metric name followed by the labels as written; use parse_exposition() for decoded labels and types
 def parse_metrics_to_dict(response_str):
-    metrics_dict = {}
-    for line in response_str.strip().splitlines():
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
-        match = re.match(r'(\w+)(\{.*?\})?\s+([\d\.\-eE]+)$', line)
-        if match:
-            metric, labels_str, value = match.groups()
-            key = f"{metric}{labels_str or ''}"
-            metrics_dict[key] = value
-    return metrics_dict
+    return {metric_key(metric, labels_str): value for metric, labels_str, value in iter_raw_samples(response_str)}
 
 
 # This function formats the metrics into a table-like string representation
 def format_metrics_as_table(response_str, field_width=100, value_width=20):
     table_data = []
-    for line in response_str.strip().splitlines():
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
-        match = re.match(r'(\w+)(\{.*?\})?\s+([\d\.\-eE]+)$', line)
-        if not match:
-            continue
-        metric, labels_str, value = match.groups()
-        label_str = ", ".join(f"{k}={v}" for k, v in re.findall(r'(\w+)=["\'](.*?)["\']', labels_str)) if labels_str else ""
+    for metric, labels_str, value in iter_raw_samples(response_str):
+        label_str = ", ".join(f"{k}={v}" for k, v in decode_labels(labels_str))
         field = f"{metric} [{label_str}]" if label_str else metric
         wrapped_field = "\n".join(textwrap.wrap(field, width=field_width))
         wrapped_value = "\n".join(textwrap.wrap(value, width=value_width))
@@ -322,6 +510,7 @@ class TestRunner:
         self.csv_file = os.path.join(self.report_dir, "Reports.csv")
         self.test_results = []
         self.start_time = time.time()
+        self._results_lock = threading.Lock()
         self._ensure_csv_exists()
 
     # Ensure the CSV file exists and has headers
@@ -334,29 +523,33 @@ class TestRunner:
     # Log test results to both in-memory list and CSV file
     def _log_test_result(self, test_id, result, exec_time):
         formatted_time = f"{exec_time:.2f}"
-        self.test_results.append((test_id, result, formatted_time))
-        with open(self.csv_file, mode="a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([test_id, result, formatted_time])
+        with self._results_lock:
+            self.test_results.append((test_id, result, formatted_time))
+            with open(self.csv_file, mode="a", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow([test_id, result, formatted_time])
 
     # Run a test method, log its execution, and handle exceptions
-    def run_test(self, test_id, test_description, test_method):
+    # With record=False the result is only returned, so a scheduler can record results in declared order
+    def run_test(self, test_id, test_description, test_method, record=True):
         print("\n")
+        # Set before anything that can raise, so a failed setup still gets an execution time
+        start = time.time()
         try:
             logger.info(f" ----- **************************************-------")
             logger.info(f" ----- Starting Test execution - [{test_id}] -------")
             create_testcase_folder(self.report_dir, test_id)
-            logger.info(f"ALG Status: {is_ALG_active()}")
+            open_ALG_log_window(test_id)
+            alg_active, alg_logs_start_mark = ALG_status_and_mark()
+            logger.info(f"ALG Status: {alg_active}")
             start = time.time()
-            alg_logs_start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             start_testcase(test_id, test_description)
             logger.info(f"[{test_id}] - {test_description}")
+            start_metrics_sampler(test_id)
             test_method()
             result = "PASS"
             end = time.time()
-            alg_logs_end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            get_ALG_logs(test_id, alg_logs_start_time, alg_logs_end_time)
-            logger.info(f"ALG Status: {is_ALG_active()}")
+            logger.info(f"ALG Status: {collect_ALG_logs_and_status(test_id, alg_logs_start_mark)}")
         except AssertionError as ae:
             logger.error(f"[Assertion Failure]: {ae}")
             result = "FAIL"
@@ -364,10 +557,14 @@ class TestRunner:
             logger.exception(f"[Exception]: {e}")
             result = "FAIL"
         finally:
+            stop_metrics_sampler(test_id)
+            close_ALG_log_window(test_id)
             end_testcase(test_id)
         end = time.time()
         logger.info(f" ----- Test execution Completed - [{test_id}] : Status - [{result}] -------")
-        self._log_test_result(test_id, result, end - start)
+        if record:
+            self._log_test_result(test_id, result, end - start)
+        return test_id, result, end - start
 
     # Generate a summary of all test results and write to CSV
     def generate_summary(self):
@@ -403,16 +600,23 @@ class TestRunner:
         
 
 # This function searches for a string in a file and counts occurrences
-def search_string_in_file(file_path, search_string, num_occurrences=None, use_regex=False):
-    count_occurrences = 0
-    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-        for _, line in enumerate(file, 1):
-            if use_regex:
-                if re.search(search_string, line):
-                    count_occurrences += 1
-            else:
-                if search_string in line:
-                    count_occurrences += 1
+def search_string_in_file(file_path, search_string, num_occurrences=None, use_regex=False, use_mmap=None):
+    # use_mmap None picks the mmap byte search for large files; patterns are matched on UTF-8 bytes in that mode
+    if use_mmap is None:
+        use_mmap = os.path.getsize(file_path) >= MMAP_THRESHOLD
+    if use_mmap:
+        count_occurrences = count_matching_lines(file_path, search_string, use_regex)
+    else:
+        count_occurrences = 0
+        regex = compile_pattern(search_string) if use_regex else None
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+            for line in file:
+                if use_regex:
+                    if regex.search(line):
+                        count_occurrences += 1
+                else:
+                    if search_string in line:
+                        count_occurrences += 1
 
     logger.debug(f"{search_string} - found {count_occurrences} times in - {file_path}")
 
@@ -440,9 +644,7 @@ def get_filter_rules_and_validate(
         host=config['ALG']['DOMAIN_NAME'], 
         port=config['ALG']['PORT']
     ):
-    # Load expected values from JSON file
-    with open(expected_values_path, "r") as f:
-        expected_values = json.load(f)
+    expected_values = get_expected_values(expected_values_path)
         
     status_code, body = trigger_api(api_key, api_file, host, port)
     expected = expected_values[expected_values_key]
@@ -455,6 +657,8 @@ def get_filter_rules_and_validate(
 
 # This function runs a remote command via SSH and returns the output
 def run_remote_command(ip_address, username, password, command, waitTime=0, port=22):
+    output = ""
+    ssh_client = None
     try:
         ssh_client = ssh_connect(ip_address, username, password, port)
         transport = ssh_client.get_transport()
@@ -478,12 +682,35 @@ def run_remote_command(ip_address, username, password, command, waitTime=0, port
             logger.warning(f"Remote command error: {error}")
         
         channel.close()
-        ssh_client.close()
     except Exception as e:
         logger.error(f"Failed to run remote command: {e}", exc_info=True)
+    finally:
+        ssh_release(ssh_client)
     return output
 
 
+# This function runs several commands on a remote server in a single exec and returns a RemoteResult per command
+# stdout, stderr and the exit status of every command are separated with nonce framed delimiters
+def run_remote_commands(ip_address, username, password, commands, port=22):
+    nonce, script = build_batch_script(commands, password)
+    try:
+        with _ssh_pool.connection(ip_address, username, password, port) as ssh_client:
+            channel = ssh_client.get_transport().open_session()
+            try:
+                channel.exec_command(script)
+                output = channel.makefile('r').read().decode('utf-8', errors='replace')
+            finally:
+                channel.close()
+    except Exception as e:
+        logger.error(f"Failed to run remote commands: {e}", exc_info=True)
+        return [RemoteResult("", "", None) for _ in commands]
+    results = parse_batch_output(nonce, output, len(commands))
+    for command, result in zip(commands, results):
+        if result.stderr:
+            logger.warning(f"Remote command error ({command}): {result.stderr.strip()}")
+    return results
+
+
 # This function checks if the ALG service is active (running) on the ALG server
 def is_ALG_active():
     """
@@ -496,46 +723,300 @@ def is_ALG_active():
             config['ALG']['IP_ADDRESS'],
             config['ALG']['USERNAME'],
             config['ALG']['PASSWORD'],
-            "systemctl status alggo | head -n 10"
+            ALG_STATUS_COMMAND
         )
-        if "Active: active (running)" in output:
-            logger.info("ALG service is active (running)")
-            return True
-        else:
-            logger.warning("ALG service is NOT active (running). Output:\n" + output)
-            return False
+        return _parse_ALG_status(output)
     except Exception as e:
         logger.error(f"Failed to check ALG status: {e}", exc_info=True)
         return False
 
 
+ALG_STATUS_COMMAND = "systemctl status alggo | head -n 10"
+
+
+# This function checks the output of ALG_STATUS_COMMAND for an active (running) service
+def _parse_ALG_status(output):
+    if "Active: active (running)" in output:
+        logger.info("ALG service is active (running)")
+        return True
+    logger.warning("ALG service is NOT active (running). Output:\n" + output)
+    return False
+
+
+# This function checks the ALG status from the RemoteResult of ALG_STATUS_COMMAND in a batch
+# If the batch did not run the command the status is unknown, so it is checked again on its own
+def _batched_ALG_status(status):
+    if status.exit_status is None:
+        return is_ALG_active()
+    return _parse_ALG_status(status.stdout)
+
+
+# This function checks the ALG status and marks the ALG journal in a single round trip
+# Returns (ALG active, JournalMark); used by TestRunner before each test
+def ALG_status_and_mark():
+    if _journal_tail is not None and _journal_tail.active:
+        return is_ALG_active(), mark_ALG_journal()
+    alg = config['ALG']
+    logger.info("Checking ALG service status")
+    status, cursor = run_remote_commands(alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD'], [ALG_STATUS_COMMAND, cursor_command("alggo")])
+    mark = None
+    if cursor.exit_status == 0:
+        try:
+            mark = JournalMark(parse_cursor(cursor.stdout), time.time())
+        except Exception as e:
+            logger.warning(f"Failed to parse ALG journal cursor ({e}), reading it again")
+    return _batched_ALG_status(status), mark if mark is not None else mark_ALG_journal()
+
+
+# This function collects the ALG logs of a test case and checks the ALG status in a single round trip
+# Returns ALG active; used by TestRunner after each test
+def collect_ALG_logs_and_status(testcase_id, since, file_name="ALG.log"):
+    if close_ALG_log_window(testcase_id, file_name) or (_journal_tail is not None and _journal_tail.active):
+        return is_ALG_active()
+    alg = config['ALG']
+    key, position, mode = _journal_fetch_position(testcase_id, since, file_name)
+    logger.info("Retriving ALG logs for the test case")
+    status, journal = run_remote_commands(alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD'],
+                                          [ALG_STATUS_COMMAND, journal_command("alggo", position, text_safe=True)])
+    if journal.exit_status != 0 or not _write_batched_journal(testcase_id, file_name, key, mode, journal.stdout):
+        get_ALG_logs(testcase_id, since, file_name=file_name)
+    return _batched_ALG_status(status)
+
+
+# This function writes the output of journal_command(text_safe=True) from a batch to the log file of a test case
+# Returns False on failure, after dropping anything it wrote, so the logs can be fetched again
+def _write_batched_journal(testcase_id, file_name, key, mode, output):
+    log_file_path = os.path.join(_report_dir, testcase_id, file_name)
+    try:
+        with open(log_file_path, mode) as f:
+            start = f.tell()
+            try:
+                cursor, written, transferred = decode_journal(output, f)
+            except Exception:
+                f.truncate(start)
+                raise
+        _store_journal_cursor(key, cursor)
+    except Exception as e:
+        logger.warning(f"Failed to write the batched ALG logs, fetching them again: {e}")
+        return False
+    logger.info(f"ALG logs retrived successfully to - {log_file_path} ({written} bytes, {transferred} bytes transferred)")
+    return True
+
+
+# This function records a timing measurement (e.g. ALG startup latency) in Timings.csv of the current run
+# so it can be trended across builds
+_timings_lock = threading.Lock()
+def record_timing(testcase_id, measurement, seconds):
+    timings_file = os.path.join(_report_dir, "Timings.csv")
+    with _timings_lock:
+        new_file = not os.path.exists(timings_file)
+        with open(timings_file, mode="a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["Timestamp", "Test ID", "Measurement", "Seconds"])
+            writer.writerow([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), testcase_id, measurement, f"{seconds:.3f}"])
+
+
+# This function polls a readiness probe with exponential backoff until it succeeds or the deadline passes
+def _poll_until(probe, deadline, initial_delay=0.25, max_delay=2.0):
+    delay = initial_delay
+    while True:
+        try:
+            if probe():
+                return time.monotonic()
+        except Exception as e:
+            logger.debug(f"Readiness probe {probe.__name__} failed: {e}")
+        if time.monotonic() + delay > deadline:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+# This function waits until the ALG service is ready after a (re)start
+# It polls 'systemctl is-active', the /metrics endpoint and the journal for "Started ALG-GO" concurrently
+# Returns the time-to-ready in seconds measured from started_at (time.monotonic()), or None on timeout
+def wait_for_ALG_ready(since, started_at=None, timeout=60):
+    started_at = started_at if started_at is not None else time.monotonic()
+    deadline = started_at + timeout
+    alg = config['ALG']
+
+    def service_active():
+        output = run_remote_command(alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD'], "systemctl is-active alggo")
+        return output.strip().splitlines()[-1:] == ["active"]
+
+    def metrics_endpoint():
+        status_code, _ = trigger_api("get_metrics")
+        return status_code == 200
+
+    def journal_started():
+        if _journal_tail is not None and _journal_tail.active:
+            return _journal_tail.contains("Started ALG-GO", _to_epoch(since))
+        output = run_remote_command(alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD'],
+                                    f'journalctl --no-pager -u alggo {journal_position(since)} | grep -c "Started ALG-GO"')
+        return output.strip().splitlines()[-1:] not in ([], ["0"])
+
+    probes = [service_active, metrics_endpoint, journal_started]
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        ready_times = list(executor.map(lambda probe: _poll_until(probe, deadline), probes))
+
+    for probe, ready_time in zip(probes, ready_times):
+        if ready_time is None:
+            logger.error(f"ALG readiness probe '{probe.__name__}' did not succeed within {timeout} seconds")
+        else:
+            logger.debug(f"ALG readiness probe '{probe.__name__}' succeeded after {ready_time - started_at:.2f} seconds")
+    if None in ready_times:
+        return None
+    time_to_ready = max(ready_times) - started_at
+    logger.info(f"ALG service ready after {time_to_ready:.2f} seconds")
+    return time_to_ready
+
+
+# This function restarts the ALG service and waits until it is ready
+# The measured startup latency is recorded in Timings.csv
+def restart_ALG_service(testcase_id, timeout=60):
+    alg = config['ALG']
+    since = mark_ALG_journal()
+    started_at = time.monotonic()
+    run_remote_command(alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD'], "sudo systemctl restart alggo.service")
+    # Kept-alive HTTPS connections to the old process are closed by the restart
+    _https_pool.close_all()
+    time_to_ready = wait_for_ALG_ready(since, started_at, timeout)
+    if time_to_ready is None:
+        raise AssertionError(f"ALG service not ready within {timeout} seconds after restart")
+    record_timing(testcase_id, "alg_startup_latency", time_to_ready)
+    return time_to_ready
+
+
+# Streaming tail of the ALG journal for the whole run, None when logs are fetched with journalctl per test
+_journal_tail = None
+
+
+# Cursor reached by the last fetch of each (testcase_id, file_name), so later fetches only append new entries
+_journal_cursors = {}
+_journal_cursors_lock = threading.Lock()
+
+
+# This function converts a JournalMark or a "%Y-%m-%d %H:%M:%S" journal time to local epoch seconds
+def _to_epoch(value):
+    if isinstance(value, JournalMark):
+        return value.timestamp
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp()
+
+
+# This function marks the current end of the ALG journal; pass the mark to get_ALG_logs as `since`
+# Falls back to the local time string if the cursor cannot be read
+def mark_ALG_journal():
+    if _journal_tail is not None and _journal_tail.active:
+        return JournalMark(_journal_tail.cursor, time.time())
+    alg = config['ALG']
+    try:
+        with _ssh_pool.connection(alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD']) as client:
+            return JournalMark(query_cursor(client, "alggo"), time.time())
+    except Exception as e:
+        logger.warning(f"Failed to read ALG journal cursor, using local time: {e}")
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# This function starts following the ALG journal for the run; per-test ALG logs are then served from the stream
+def start_ALG_journal_tail():
+    global _journal_tail
+    if _journal_tail is not None:
+        return True
+    alg = config['ALG']
+    tail = JournalTail(_ssh_pool, alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD'], os.path.join(_report_dir, "ALG_journal.log"))
+    try:
+        tail.start()
+    except Exception as e:
+        logger.error(f"Failed to start ALG journal tail, falling back to journalctl per test: {e}", exc_info=True)
+        tail.stop()
+        return False
+    _journal_tail = tail
+    return True
+
+
+# This function stops following the ALG journal
+def stop_ALG_journal_tail():
+    global _journal_tail
+    if _journal_tail is not None:
+        _journal_tail.stop()
+        _journal_tail = None
+atexit.register(stop_ALG_journal_tail)
+
+
+# This function starts writing the ALG logs of a test case to its log file as they arrive
+def open_ALG_log_window(testcase_id, file_name="ALG.log"):
+    if _journal_tail is None or not _journal_tail.active:
+        return False
+    _journal_tail.open_window((testcase_id, file_name), os.path.join(_report_dir, testcase_id, file_name))
+    return True
+
+
+# This function completes the ALG log file of a test case; returns False if no window was open
+def close_ALG_log_window(testcase_id, file_name="ALG.log"):
+    if _journal_tail is None:
+        return False
+    log_file_path = _journal_tail.close_window((testcase_id, file_name))
+    if log_file_path is not None:
+        logger.info(f"ALG logs retrived successfully to - {log_file_path}")
+    return log_file_path is not None
+
+
+# This function returns where the next fetch of a log file starts: (key, position, file mode)
+# A file fetched before continues from the cursor of that fetch, else the fetch starts at `since`
+def _journal_fetch_position(testcase_id, since, file_name):
+    key = (testcase_id, file_name)
+    with _journal_cursors_lock:
+        previous = _journal_cursors.get(key)
+    if previous:
+        return key, JournalMark(previous, None), "ab"
+    return key, since, "wb"
+
+
+# This function remembers the cursor reached by a fetch of a log file
+def _store_journal_cursor(key, cursor):
+    if cursor is not None:
+        with _journal_cursors_lock:
+            _journal_cursors[key] = cursor
+
+
 # This function retrieves the ALG logs from the ALG server using journalctl
+# When the journal tail is running the logs are served from the stream instead
 def get_ALG_logs(testcase_id, since, until=None, file_name="ALG.log"):
     try:
         logger.info("Retriving ALG logs for the test case")
-        if until == None:
-            cmd = f'journalctl --no-pager -u alggo --since "{since}"'
-        else:
-            cmd = f'journalctl --no-pager -u alggo --since "{since}" --until "{until}"'
-            
-        logger.info(f"Running command: {cmd}")
-        output = run_remote_command(
-            config['ALG']['IP_ADDRESS'],
-            config['ALG']['USERNAME'],
-            config['ALG']['PASSWORD'],
-            cmd
-        )
+        if _journal_tail is not None and _journal_tail.active:
+            log_file_path = os.path.join(_report_dir, testcase_id, file_name)
+            if _journal_tail.has_window((testcase_id, file_name)):
+                # The file is already being written; only wait until the stream has caught up
+                _journal_tail.barrier()
+            else:
+                _journal_tail.export(log_file_path, _to_epoch(since), _to_epoch(until) if until else None)
+            logger.info(f"ALG logs retrived successfully to - {log_file_path}")
+            return True
+
+        key, position, mode = _journal_fetch_position(testcase_id, since, file_name)
+        if isinstance(until, JournalMark):
+            until = None
+
         # Use the global _report_dir for the current automation run
         log_file_path = os.path.join(_report_dir, testcase_id, file_name)
-        with open(log_file_path, "w", encoding="utf-8") as f:
-            f.write(output)
-        logger.info(f"ALG logs retrived successfully to - {log_file_path}")
+        alg = config['ALG']
+        with _ssh_pool.connection(alg['IP_ADDRESS'], alg['USERNAME'], alg['PASSWORD']) as client:
+            with open(log_file_path, mode) as f:
+                cursor, written, transferred = fetch_journal(client, "alggo", position, f, until)
+        _store_journal_cursor(key, cursor)
+        logger.info(f"ALG logs retrived successfully to - {log_file_path} ({written} bytes, {transferred} bytes transferred)")
         return True
     except Exception as e:
         logger.error(f"Failed to get ALG logs: {e}", exc_info=True)
         return False
 
 
+# This function loads the ALG log of a test case as an indexed ALGLog (see ALGLog.query and ALGLog.verify)
+def load_ALG_log(testcase_id, file_name="ALG.log"):
+    return ALGLog.load(os.path.join(_report_dir, testcase_id, file_name))
+
+
 # This function retrieves the metrics fields from the ALG server
 def get_metrics_fields():
     status_code, metrics_raw = trigger_api("get_metrics")
@@ -544,37 +1025,131 @@ def get_metrics_fields():
     return parse_metrics_to_dict(metrics_raw)
 
 
-# This function compares the difference in a specific metric field between two metrics dictionaries
+# This function retrieves the ALG metrics once as both (fields like get_metrics_fields, Exposition)
+# (None, None) if the metrics could not be retrieved
+def get_metrics_snapshot():
+    status_code, metrics_raw = trigger_api("get_metrics")
+    if not isinstance(metrics_raw, str):
+        return None, None
+    return parse_metrics_to_dict(metrics_raw), parse_exposition(metrics_raw)
+
+
+# This function checks the latency SLOs of a test case ("latency_slos" in the expected values file) for the
+# interval between two Expositions and logs every result; returns a MetricsReport
+def verify_latency_slos(testcase_id, initial_exposition, final_exposition):
+    expected_values = get_expected_values(expected_values_path)
+    report = check_latency_slos(initial_exposition, final_exposition, expected_values.get(testcase_id, {}).get("latency_slos", []))
+    for slo, value, passed in report.results:
+        if passed:
+            logger.info(f"Latency SLO met: {slo} - got {value:g}")
+        else:
+            logger.error(f"Latency SLO missed: {slo} - got {value:g}")
+    return report
+
+
+# This function logs p50/p95/p99 of every series of a histogram family (default all histograms) between two Expositions
+def log_histogram_quantiles(initial_exposition, final_exposition, family=None):
+    families = [family] if family else [name for name, kind in final_exposition.types.items() if kind == "histogram"]
+    for family in families:
+        for labels, quantiles in interval_quantiles(initial_exposition, final_exposition, family).items():
+            series = ", ".join(f"{name}={value}" for name, value in labels)
+            values = ", ".join(f"p{q * 100:g}={value:g}" for q, value in quantiles.items())
+            logger.info(f"{family}{f' [{series}]' if series else ''}: {values}")
+
+
+# This function scrapes the ALG metrics on the pooled HTTPS connection without logging the request
+# Used by the background sampler, which would otherwise flood the test logs
+def _scrape_metrics():
+    api_request = get_api_catalog(os.path.join(config_dir, config['AUTOMATION_VARS']['API_FILE']))["get_metrics"]
+    status, body, _ = _https_pool.request(config['ALG']['DOMAIN_NAME'], config['ALG']['PORT'], api_request.method,
+                                          api_request.api_path, api_request.body, api_request.headers,
+                                          config['TLS_CERTS']['CERT'], config['TLS_CERTS']['KEY'], config['TLS_CERTS']['CA'])
+    if status != 200:
+        return None
+    return parse_metrics_to_dict(body)
+
+
+# Background metrics samplers of the running tests, by test ID
+_metrics_samplers = {}
+_metrics_samplers_lock = threading.Lock()
+
+
+# This function starts sampling the ALG metrics every METRICS_SAMPLE_INTERVAL seconds for a test
+# Returns None when sampling is disabled (interval 0, the default). Each running test scrapes on its own, so
+# with MAX_PARALLEL_TESTS above 1 the load on the ALG /metrics endpoint grows with the number of parallel tests.
+def start_metrics_sampler(testcase_id):
+    interval = config.getfloat('AUTOMATION_VARS', 'METRICS_SAMPLE_INTERVAL', fallback=0)
+    if interval <= 0:
+        return None
+    sampler = MetricsSampler(_scrape_metrics, interval, name=f"metrics-{testcase_id}")
+    with _metrics_samplers_lock:
+        _metrics_samplers[testcase_id] = sampler
+    sampler.start()
+    return sampler
+
+
+# This function stops the metrics sampler of a test and writes Metrics_samples.csv/.json to the test folder
+def stop_metrics_sampler(testcase_id):
+    with _metrics_samplers_lock:
+        sampler = _metrics_samplers.pop(testcase_id, None)
+    if sampler is None:
+        return None
+    sampler.stop()
+    if not len(sampler):
+        logger.warning(f"No ALG metrics samples collected ({sampler.errors} failed scrapes)")
+        return sampler
+    try:
+        test_dir = os.path.join(_report_dir, testcase_id)
+        sampler.export_csv(os.path.join(test_dir, "Metrics_samples.csv"))
+        sampler.export_json(os.path.join(test_dir, "Metrics_samples.json"))
+    except Exception as e:
+        logger.error(f"Failed to export ALG metrics samples: {e}", exc_info=True)
+        return sampler
+    busiest = sorted(((entry["peak_rate"], key, entry) for key, entry in sampler.summary().items() if entry.get("peak_rate")), reverse=True)[:5]
+    for peak_rate, key, entry in busiest:
+        logger.debug(f"Metric {key}: mean rate {entry['mean_rate']:.2f}/s, peak rate {peak_rate:.2f}/s, longest stall {entry['longest_stall']:.1f} s")
+    logger.info(f"Collected {len(sampler)} ALG metrics samples ({sampler.errors} failed scrapes) to - {test_dir}")
+    return sampler
+
+
+# This function checks the metrics expectations of a test case ("metrics_to_validate" in the expected values
+# file) against two or more metrics snapshots and logs every result; returns a MetricsReport
+def check_metrics_diff(testcase_id, *snapshots):
+    metrics = snapshots[0] if len(snapshots) == 1 and isinstance(snapshots[0], MetricsSnapshots) else MetricsSnapshots(snapshots)
+    expected_values = get_expected_values(expected_values_path)
+    report = metrics.check(expected_values.get(testcase_id, {}).get("metrics_to_validate", []))
+    for expectation, actual, passed in report.results:
+        if passed:
+            logger.info(f"Metric diff for '{expectation.field}' matches: {actual:g}")
+        else:
+            logger.error(f"Metric diff does not match: {expectation} - got {actual:g}")
+    return report
+
+
+# This function returns the expected deltas of a test case ("metrics_to_validate" in the expected values file)
+# as {field: (min, max)} for wait_for_metrics; ratio expectations are left out
+def expected_metric_deltas(testcase_id):
+    expected_values = get_expected_values(expected_values_path)
+    expectations = [MetricExpectation.from_dict(entry) for entry in expected_values.get(testcase_id, {}).get("metrics_to_validate", [])]
+    return {expectation.field: expectation.bounds() for expectation in expectations if expectation.ratio_to is None}
+
+
+# This function waits until the ALG metrics have changed from the baseline by the expected deltas
+# Returns (met, {field: delta seen}); the time taken is recorded in Timings.csv
+def wait_for_metrics(expected_deltas, timeout, baseline=None):
+    if baseline is None:
+        baseline = _scrape_metrics() or {}
+    start = time.monotonic()
+    met, deltas = wait_for_metric_deltas(_scrape_metrics, baseline, expected_deltas, timeout)
+    if met:
+        record_timing(get_current_testcase(), "metrics_wait", time.monotonic() - start)
+    return met, deltas
+
+
+# This function compares the difference of the metric fields of a test case between two metrics dictionaries
 def compare_metrics_diff(initial_metrics, final_metrics, testcase_id):
     try:
-        with open(expected_values_path, "r") as f:
-            expected_values = json.load(f)
-        testcase_metrics = expected_values.get(testcase_id, {}).get("metrics_to_validate", [])
-        all_pass = True
-        for metric in testcase_metrics:
-            field = metric["field"]
-            expected_diff = metric["expected_diff"]
-            try:
-                initial_val = int(float(initial_metrics.get(field, 0) or 0))
-                final_val = int(float(final_metrics.get(field, 0) or 0))
-                actual_diff = int(final_val - initial_val)
-                logger.info(f"Comparing {field}: Initial={initial_val}, Final={final_val}, Diff={actual_diff}")
-            except (TypeError, ValueError):
-                logger.error(f"Could not parse values for field '{field}'")
-                all_pass = False
-                continue
-            try:
-                expected_diff_int = int(expected_diff)
-            except (TypeError, ValueError):
-                logger.error(f"Could not parse expected diff for field '{field}'")
-                all_pass = False
-                continue
-            if actual_diff != expected_diff_int:
-                logger.error(f"Metric diff for '{field}' does not match: actual={actual_diff}, expected={expected_diff_int}")
-                all_pass = False
-            else:
-                logger.info(f"Metric diff for '{field}' matches: {actual_diff}")
-        return 'PASS' if all_pass else 'FAIL'
+        return 'PASS' if check_metrics_diff(testcase_id, initial_metrics, final_metrics).passed else 'FAIL'
     except Exception as e:
         logger.error(f"Failed to compare metrics diff for testcase {testcase_id}: {e}", exc_info=True)
         return 'FAIL'
@@ -621,6 +1196,10 @@ def generate_config_files():
     update_config_file('Config/NEM_config.yaml', f"{output_dir}/NEM_ipv4_config.yaml", nem_ipv4_config_params)
     update_config_file('Config/NE_config.yaml', f"{output_dir}/NE_ipv6_config.yaml", ne_ipv6_config_params)
     update_config_file('Config/NEM_config.yaml', f"{output_dir}/NEM_ipv6_config.yaml", nem_ipv6_config_params)
+    stage_simulator_configs(
+        [f"{output_dir}/NE_ipv4_config.yaml", f"{output_dir}/NE_ipv6_config.yaml"],
+        [f"{output_dir}/NEM_ipv4_config.yaml", f"{output_dir}/NEM_ipv6_config.yaml"]
+    )
  
     
 def update_config_file(file_path: str, output_file: str = None, updates: dict ={}):
@@ -737,51 +1316,104 @@ def generate_mml_command(cmd_json: dict) -> str:
     return final_hex
 
 
-def update_remote_alg_config(ip_address, username, password, updates: dict, port=22, remote_path=config['ALG']['CONFIG_PATH']):
-    ssh_client = None
-    try:
-        ssh_client = paramiko.SSHClient()
-        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh_client.connect(ip_address, port=port, username=username, password=password)
-        
-        tmp_remote = "/tmp/alg-config.json"
-        _, stdout, stderr = ssh_client.exec_command(f"sudo cp {remote_path} {tmp_remote} && sudo chmod 666 {tmp_remote}")
-        exit_status = stdout.channel.recv_exit_status()
-        if exit_status != 0:
-            raise RuntimeError(stderr.read().decode())
-        
-        sftp = ssh_client.open_sftp()
-
-        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-            local_path = tmp_file.name
-        sftp.get(tmp_remote, local_path)
-
-        with open(local_path, "r") as f:
-            config = json.load(f)
-
-        for key, value in updates.items():
-            if key in config:
-                config[key] = value
-            else:
-                # add new keys if not present
-                config[key] = value
-
-        with open(local_path, "w") as f:
-            json.dump(config, f, indent=2)
+# Script run with python3 on the ALG host: updates the config file and replaces it atomically, keeping its owner
+# and mode. Mode "merge" applies a JSON merge-patch (RFC 7386, null removes a key), mode "replace" sets the
+# top-level keys to the given values. Prints "changed" or "unchanged".
+_ALG_CONFIG_PATCH_SCRIPT = """
+import base64, json, os, sys, tempfile
+patch = json.loads(base64.b64decode(sys.argv[1]))
+path = sys.argv[2]
+mode = sys.argv[3]
+def merge(target, patch):
+    if not isinstance(patch, dict):
+        return patch
+    if not isinstance(target, dict):
+        target = {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = merge(target.get(key), value)
+    return target
+with open(path) as f:
+    original = json.load(f)
+updated = json.loads(json.dumps(original))
+if mode == "merge":
+    updated = merge(updated, patch)
+else:
+    updated.update(patch)
+if updated == original:
+    print("unchanged")
+    sys.exit(0)
+st = os.stat(path)
+fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".alg-config-")
+try:
+    with os.fdopen(fd, "w") as f:
+        json.dump(updated, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(tmp, st.st_mode & 0o7777)
+    os.chown(tmp, st.st_uid, st.st_gid)
+    os.replace(tmp, path)
+except BaseException:
+    os.unlink(tmp)
+    raise
+print("changed")
+"""
+
+
+# This function applies a JSON merge-patch to the ALG config file in a single remote exec
+# Several keys can be updated at once (nested dicts are merged, None removes a key). With restart=True the
+# ALG service is restarted in the same exec and the function waits until it is ready; the startup latency is
+# recorded like restart_ALG_service does. Returns True if the config file changed.
+def patch_remote_alg_config(ip_address, username, password, patch: dict, restart=False, testcase_id=None, timeout=60,
+                            port=22, remote_path=config['ALG']['CONFIG_PATH']):
+    return _apply_remote_alg_config(ip_address, username, password, patch, "merge", restart, testcase_id, timeout, port, remote_path)
+
+
+# This function writes the ALG config file with _ALG_CONFIG_PATCH_SCRIPT in the given mode, see patch_remote_alg_config
+# The sudo password is written to the channel's stdin (once per sudo), so it does not show on the remote command line
+def _apply_remote_alg_config(ip_address, username, password, updates, mode, restart, testcase_id, timeout, port, remote_path):
+    script = base64.b64encode(_ALG_CONFIG_PATCH_SCRIPT.encode()).decode()
+    updates_arg = base64.b64encode(json.dumps(updates).encode()).decode()
+    command = f'sudo -S -p \'\' python3 -c "$(echo {script} | base64 -d)" {updates_arg} {shlex.quote(remote_path)} {mode}'
+    sudo_count = 1
+    if restart:
+        command += " && sudo -S -p '' systemctl restart alggo.service"
+        sudo_count += 1
+        since = mark_ALG_journal()
+        started_at = time.monotonic()
 
-        sftp.put(local_path, tmp_remote)
-        
-        _, stdout, stderr = ssh_client.exec_command(f"sudo mv {tmp_remote} {remote_path}")
-        exit_status = stdout.channel.recv_exit_status()
+    try:
+        with _ssh_pool.connection(ip_address, username, password, port) as ssh_client:
+            channel = ssh_client.get_transport().open_session()
+            try:
+                channel.exec_command(command)
+                channel.sendall((password + "\n").encode() * sudo_count)
+                channel.shutdown_write()
+                output = channel.makefile('r').read().decode('utf-8', errors='replace')
+                error = channel.makefile_stderr('r').read().decode('utf-8', errors='replace')
+                exit_status = channel.recv_exit_status()
+            finally:
+                channel.close()
         if exit_status != 0:
-            raise RuntimeError(stderr.read().decode())
-
-        logger.info(f"✅ Updated {remote_path} on {ip_address}")
-
-        sftp.close()
-        ssh_client.close()
-
+            raise RuntimeError(error.strip() or f"exit status {exit_status}")
     except Exception as e:
-        if ssh_client:
-            ssh_client.close()
-        raise RuntimeError(f"Failed to update {remote_path} on {ip_address}: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Failed to update {remote_path} on {ip_address}: {e}")
+
+    if restart:
+        _https_pool.close_all()
+    changed = "changed" in output.split()
+    logger.info(f"✅ Updated {remote_path} on {ip_address}" if changed else f"{remote_path} on {ip_address} already up to date")
+    if restart:
+        time_to_ready = wait_for_ALG_ready(since, started_at, timeout)
+        if time_to_ready is None:
+            raise AssertionError(f"ALG service not ready within {timeout} seconds after restart")
+        record_timing(testcase_id or get_current_testcase(), "alg_startup_latency", time_to_ready)
+    return changed
+
+
+# This function updates top-level keys of the ALG config file: each key is set to its value, replacing nested dicts
+# as a whole (use patch_remote_alg_config to merge them)
+def update_remote_alg_config(ip_address, username, password, updates: dict, port=22, remote_path=config['ALG']['CONFIG_PATH']):
+    _apply_remote_alg_config(ip_address, username, password, updates, "replace", False, None, 60, port, remote_path)
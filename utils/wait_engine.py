@@ -0,0 +1,157 @@
+import re
+import time
+import logging
+
+logger = logging.getLogger("AutomationLogger")
+
+
+# This class represents a completion condition on a simulator output stream
+# A condition is met once `count` output lines contain the literal (or match the regex)
+class OutputCondition:
+    def __init__(self, pattern, use_regex=False, count=1):
+        self.pattern = pattern
+        self.use_regex = use_regex
+        self.count = count
+        self.seen = 0
+        self._regex = re.compile(pattern) if use_regex else None
+
+    @property
+    def met(self):
+        return self.seen >= self.count
+
+    # Check one output line against the condition
+    def feed_line(self, line):
+        if self.met:
+            return
+        if self._regex is not None:
+            if self._regex.search(line):
+                self.seen += 1
+        elif self.pattern in line:
+            self.seen += 1
+
+    def __str__(self):
+        return f"[{self.pattern}] seen {self.seen}/{self.count}"
+
+
+# This function returns the regex of a row of the simulator stats table, e.g. "| Total connections | 2 |"
+# The simulator stats are cumulative; for a reused simulator (see Server.attach) pass it as `server`, so the
+# value counts from the start of the current test case
+def stats_pattern(field, value=None, server=None):
+    if value is not None and server is not None:
+        value += server.stats_offset.get(field, 0)
+    value_pattern = re.escape(str(value)) if value is not None else r"[^|]*"
+    return rf"\|\s*{re.escape(field)}\s*\|\s*{value_pattern}\s*\|"
+
+
+# This function builds a condition on a row of the simulator stats table, see stats_pattern()
+def stats_row(field, value=None, server=None):
+    return OutputCondition(stats_pattern(field, value, server), use_regex=True)
+
+
+# This class splits an output stream into lines and evaluates a set of conditions on them
+class OutputWatcher:
+    def __init__(self, conditions):
+        self.conditions = [c if isinstance(c, OutputCondition) else OutputCondition(c) for c in conditions]
+        for condition in self.conditions:
+            condition.seen = 0
+        self._partial = ""
+
+    @property
+    def satisfied(self):
+        return all(c.met for c in self.conditions)
+
+    # Feed a chunk of output; only complete lines are evaluated
+    def feed(self, text):
+        lines = (self._partial + text.replace("\r", "")).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            for condition in self.conditions:
+                condition.feed_line(line)
+
+    # Evaluate the last incomplete line, used once the output stream has ended
+    def flush(self):
+        if self._partial:
+            for condition in self.conditions:
+                condition.feed_line(self._partial)
+            self._partial = ""
+
+
+# This function waits until every simulator has met its completion conditions
+# Each argument is a (server, conditions) pair; the timeout is shared by all servers
+# Returns True if all conditions were met, False if the timeout expired first
+def wait_for_simulators(timeout, *server_conditions):
+    start = time.monotonic()
+    deadline = start + timeout
+    all_met = True
+    for server, conditions in server_conditions:
+        if not conditions:
+            continue
+        remaining = max(0.0, deadline - time.monotonic())
+        if not server.wait_until(conditions, remaining):
+            all_met = False
+    elapsed = time.monotonic() - start
+    if all_met:
+        logger.info(f"Simulators completed the operation in {elapsed:.2f} seconds")
+    else:
+        logger.warning(f"Simulators did not meet completion conditions within {timeout} seconds")
+    return all_met
+
+
+# This function polls metrics until every field has changed from the baseline by its expected delta
+# expected_deltas maps a field to an exact delta or a (min, max) range; fetch returns {field: value} or None.
+# The poll interval adapts: it shrinks toward the estimated time of completion while the counters move and
+# backs off while they do not. A counter that went past its range cannot come back, so that fails at once.
+# Returns (True if all deltas were met, {field: delta seen at the last poll})
+def wait_for_metric_deltas(fetch, baseline, expected_deltas, timeout, min_interval=0.1, max_interval=2.0):
+    targets = {field: (expected, expected) if not isinstance(expected, (tuple, list)) else tuple(expected)
+               for field, expected in expected_deltas.items()}
+    start = time.monotonic()
+    deadline = start + timeout
+    interval = min_interval
+    deltas = {field: 0.0 for field in targets}
+    while True:
+        try:
+            metrics = fetch()
+        except Exception as e:
+            logger.debug(f"Metrics poll failed: {e}")
+            metrics = None
+        now = time.monotonic()
+        if metrics is not None:
+            previous = deltas
+            deltas = {field: _metric_value(metrics, field) - _metric_value(baseline, field) for field in targets}
+            if all(low <= deltas[field] <= high for field, (low, high) in targets.items()):
+                logger.info(f"Metrics reached the expected deltas in {now - start:.2f} seconds: {deltas}")
+                return True, deltas
+            overshot = [field for field, (low, high) in targets.items() if deltas[field] > high]
+            if overshot:
+                logger.error(f"Metrics went past the expected deltas after {now - start:.2f} seconds: {overshot} - {deltas}")
+                return False, deltas
+            interval = _next_interval(targets, previous, deltas, now - start, interval, min_interval, max_interval)
+        else:
+            interval = min(interval * 2, max_interval)
+        if now >= deadline:
+            logger.error(f"Metrics did not reach the expected deltas within {timeout} seconds: {deltas}")
+            return False, deltas
+        time.sleep(min(interval, deadline - now))
+
+
+# This function returns a metric value as float, 0 when the metric is not exported (yet)
+def _metric_value(metrics, field):
+    try:
+        return float(metrics.get(field, 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# This function picks the next poll interval from the progress made since the last poll
+def _next_interval(targets, previous, deltas, elapsed, interval, min_interval, max_interval):
+    if deltas == previous:
+        return min(interval * 2, max_interval)
+    # Time to completion of the slowest field at its average rate so far; poll at half of it
+    remaining = 0.0
+    for field, (low, _) in targets.items():
+        if deltas[field] < low and deltas[field] > 0:
+            remaining = max(remaining, (low - deltas[field]) * elapsed / deltas[field])
+        elif deltas[field] < low:
+            return min_interval
+    return min(max(remaining / 2, min_interval), max_interval)